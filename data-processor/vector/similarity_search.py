@@ -44,7 +44,8 @@ class SimilaritySearcher:
                        query: str,
                        limit: int = None,
                        score_threshold: float = None,
-                       filters: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+                       filters: Dict[str, Any] = None,
+                       ef: int = None) -> List[Dict[str, Any]]:
         """
         语义搜索
         
@@ -53,6 +54,7 @@ class SimilaritySearcher:
             limit: 返回结果数量
             score_threshold: 相似度阈值
             filters: 过滤条件
+            ef: 查询时HNSW候选集大小（默认取配置）
             
         Returns:
             搜索结果列表
@@ -77,7 +79,8 @@ class SimilaritySearcher:
                 query_vector=query_vector,
                 limit=limit,
                 score_threshold=score_threshold,
-                filter_conditions=filters
+                filter_conditions=filters,
+                hnsw_ef=ef
             )
             
             # 后处理结果
@@ -237,7 +240,8 @@ class SimilaritySearcher:
                 logger.error(f"文档 {document_id} 不存在")
                 return []
             
-            target_vector = np.array(target_document['vector'])
+            # 检索返回的向量已是列表，直接复用，无需再转换
+            target_vector = target_document['vector']
             
             # 搜索相似向量
             search_limit = limit + 1 if exclude_self else limit
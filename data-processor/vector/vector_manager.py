@@ -19,6 +19,9 @@ from .vector_store import VectorStore
 from .similarity_search import SimilaritySearcher
 from config import config
 
+# 搜索日志采样间隔（每N次搜索记录一次INFO日志）
+SEARCH_LOG_SAMPLE_RATE = 100
+
 
 class VectorManager:
     """向量管理器"""
@@ -27,7 +30,10 @@ class VectorManager:
                  embedder_type: str = "sentence_transformers",
                  embedder_model: str = None,
                  qdrant_url: str = None,
-                 collection_name: str = None):
+                 collection_name: str = None,
+                 hnsw_m: int = None,
+                 hnsw_ef_construct: int = None,
+                 bulk_load: bool = False):
         """
         初始化向量管理器
         
@@ -36,6 +42,9 @@ class VectorManager:
             embedder_model: 向量化模型名称
             qdrant_url: Qdrant服务URL
             collection_name: 向量集合名称
+            hnsw_m: HNSW连接数（批量建库可调低至8以加快写入）
+            hnsw_ef_construct: HNSW构建候选集大小（批量建库可调低至64）
+            bulk_load: 批量导入模式，重建集合期间推迟HNSW索引构建
         """
         # 初始化组件
         self.embedder = TextEmbedder(
@@ -46,7 +55,10 @@ class VectorManager:
         self.vector_store = VectorStore(
             qdrant_url=qdrant_url,
             collection_name=collection_name,
-            vector_dimension=self.embedder.vector_dimension
+            vector_dimension=self.embedder.vector_dimension,
+            hnsw_m=hnsw_m,
+            hnsw_ef_construct=hnsw_ef_construct,
+            bulk_load=bulk_load
         )
         
         self.similarity_searcher = SimilaritySearcher(
@@ -63,6 +75,9 @@ class VectorManager:
             'last_update': None
         }
         
+        # 搜索日志采样计数器
+        self._search_log_n = 0
+        
         # 线程池用于并行处理
         self.executor = ThreadPoolExecutor(max_workers=4)
         
@@ -71,7 +86,8 @@ class VectorManager:
     def process_and_store_documents(self, 
                                   documents: List[Dict[str, Any]],
                                   batch_size: int = None,
-                                  update_existing: bool = False) -> Dict[str, Any]:
+                                  update_existing: bool = False,
+                                  return_ids: bool = True) -> Dict[str, Any]:
         """
         处理文档并存储向量
         
@@ -79,6 +95,7 @@ class VectorManager:
             documents: 文档列表
             batch_size: 批处理大小
             update_existing: 是否更新已存在的向量
+            return_ids: 是否在结果中返回向量ID列表（大批量重建时可关闭以节省内存）
             
         Returns:
             处理结果
@@ -106,40 +123,47 @@ class VectorManager:
             
             # 分批处理
             all_stored_ids = []
+            total_stored = 0
             total_processed = 0
             
             for i in range(0, len(valid_documents), batch_size):
                 batch_documents = valid_documents[i:i + batch_size]
                 
                 # 处理批次
-                batch_result = self._process_document_batch(batch_documents)
+                batch_result = self._process_document_batch(batch_documents, return_ids=return_ids)
                 
                 if batch_result['success']:
-                    all_stored_ids.extend(batch_result['stored_ids'])
+                    if return_ids:
+                        all_stored_ids.extend(batch_result['stored_ids'])
+                    total_stored += batch_result['count']
                     total_processed += len(batch_documents)
                 
-                logger.info(f"已处理 {min(i + batch_size, len(valid_documents))}/{len(valid_documents)} 个文档")
+                # 参数随消息传入，日志级别被过滤时loguru不做格式化
+                logger.info(
+                    "已处理 {}/{} 个文档",
+                    min(i + batch_size, len(valid_documents)), len(valid_documents)
+                )
             
             # 更新统计信息
             end_time = datetime.now()
             processing_time = (end_time - start_time).total_seconds()
             
             self.stats['documents_processed'] += total_processed
-            self.stats['vectors_stored'] += len(all_stored_ids)
+            self.stats['vectors_stored'] += total_stored
             self.stats['total_processing_time'] += processing_time
             self.stats['last_update'] = end_time.isoformat()
             
             result = {
                 'success': True,
                 'processed_count': total_processed,
-                'stored_count': len(all_stored_ids),
+                'stored_count': total_stored,
                 'stored_ids': all_stored_ids,
                 'processing_time': processing_time,
                 'start_time': start_time.isoformat(),
                 'end_time': end_time.isoformat()
             }
             
-            logger.info(f"文档向量处理完成，成功存储 {len(all_stored_ids)} 个向量，耗时 {processing_time:.2f} 秒")
+            logger.info(f"文档向量处理完成，成功存储 {total_stored} 个向量，耗时 {processing_time:.2f} 秒")
             
             return result
             
@@ -152,7 +176,8 @@ class VectorManager:
                 'stored_count': 0
             }
     
-    def _process_document_batch(self, documents: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def _process_document_batch(self, documents: List[Dict[str, Any]],
+                                return_ids: bool = True) -> Dict[str, Any]:
         """处理文档批次"""
         try:
             # 提取文本内容
@@ -169,19 +194,20 @@ class VectorManager:
             
             if len(vectors) == 0:
                 logger.warning("向量化失败，没有生成向量")
-                return {'success': False, 'stored_ids': []}
+                return {'success': False, 'stored_ids': [], 'count': 0}
             
             # 存储向量
             stored_ids = self.vector_store.store_vectors(vectors, documents)
             
             return {
                 'success': True,
-                'stored_ids': stored_ids
+                'stored_ids': stored_ids if return_ids else [],
+                'count': len(stored_ids)
             }
             
         except Exception as e:
             logger.error(f"批次处理失败: {str(e)}")
-            return {'success': False, 'stored_ids': []}
+            return {'success': False, 'stored_ids': [], 'count': 0}
     
     def search(self,
                query: str,
@@ -239,7 +265,18 @@ class VectorManager:
                     filters=filters
                 )
             
-            logger.info(f"搜索完成，查询: '{query[:50]}...', 类型: {search_type}, 返回 {len(results)} 个结果")
+            # 高QPS下仅按采样记录INFO日志，其余降为DEBUG
+            self._search_log_n += 1
+            if self._search_log_n % SEARCH_LOG_SAMPLE_RATE == 1:
+                logger.info(
+                    "搜索完成，查询: '{}...', 类型: {}, 返回 {} 个结果 (已执行 {} 次搜索)",
+                    query[:50], search_type, len(results), self._search_log_n
+                )
+            else:
+                logger.debug(
+                    "搜索完成，查询: '{}...', 类型: {}, 返回 {} 个结果",
+                    query[:50], search_type, len(results)
+                )
             
             return results
             
@@ -324,7 +361,8 @@ class VectorManager:
     def build_index_from_documents(self, 
                                  documents: List[Dict[str, Any]],
                                  clear_existing: bool = False,
-                                 batch_size: int = None) -> Dict[str, Any]:
+                                 batch_size: int = None,
+                                 return_ids: bool = True) -> Dict[str, Any]:
         """从文档构建向量索引"""
         if clear_existing:
             logger.info("清空现有向量集合")
@@ -334,9 +372,14 @@ class VectorManager:
         result = self.process_and_store_documents(
             documents=documents,
             batch_size=batch_size,
-            update_existing=True
+            update_existing=True,
+            return_ids=return_ids
         )
         
+        # 批量导入模式下，数据写入完成后再启用HNSW索引
+        if self.vector_store.bulk_load:
+            self.vector_store.finalize_index()
+        
         return result
     
     def _validate_documents(self, documents: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
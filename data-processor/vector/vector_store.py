@@ -8,11 +8,13 @@
 - 向量检索
 """
 import numpy as np
-from typing import List, Dict, Any, Optional, Tuple, Union
+from typing import List, Dict, Any, Literal, Optional, Tuple, Union
 from loguru import logger
 import uuid
 from datetime import datetime
 import json
+import threading
+import time
 
 try:
     from qdrant_client import QdrantClient
@@ -23,8 +25,239 @@ except ImportError:
     QDRANT_AVAILABLE = False
     logger.warning("qdrant-client未安装，向量存储功能不可用")
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 from config import config
 
+# gRPC消息大小上限（批量写入大向量时避免超过默认4MB限制）
+GRPC_MAX_MESSAGE_LENGTH = 256 << 20
+
+# 写入payload的文档字段
+PAYLOAD_FIELDS = frozenset({
+    'title', 'content', 'url', 'source', 'publish_time', 'crawl_time',
+    'news_type', 'industry', 'importance_level', 'investment_relevance',
+    'content_hash', 'word_count', 'importance_score'
+})
+
+# payload中记录JSON编码字段名的键（新写入的点总会带上，没有JSON字段时为空列表）
+JSON_FIELDS_KEY = '_json_fields'
+
+# 新建集合时自动创建的payload索引（字段 -> 索引类型），避免过滤查询全量扫描
+FILTERABLE_PAYLOAD_INDEXES = {
+    'news_type': 'keyword',
+    'industry': 'keyword',
+    'importance_level': 'keyword',
+    'source': 'keyword',
+    'publish_time': 'datetime'
+}
+
+# 过滤器缓存的最大条目数
+FILTER_CACHE_SIZE = 256
+
+# 集合信息缓存有效期（秒）
+COLLECTION_INFO_TTL = 2.0
+
+# 常规写入时的索引阈值（KB），低于该值的段不建HNSW索引
+DEFAULT_INDEXING_THRESHOLD = 20000
+
+# 集合优化器配置档：
+# - qps: 少量大段，每次查询涉及的段更少；限制优化线程，为查询保留CPU
+# - latency: 段数与CPU核数相当，单次查询可在多段上并行
+# - ingest: 不限制优化线程，优先保证写入后尽快完成索引
+# scripts/init_qdrant.py 中有相同的配置档，修改时需同步
+OPTIMIZER_PROFILES = {
+    'qps': {
+        'default_segment_number': 2,
+        'indexing_threshold': DEFAULT_INDEXING_THRESHOLD,
+        'max_optimization_threads': 2
+    },
+    'latency': {
+        'default_segment_number': 8,
+        'indexing_threshold': DEFAULT_INDEXING_THRESHOLD
+    },
+    'ingest': {
+        'indexing_threshold': DEFAULT_INDEXING_THRESHOLD
+    }
+}
+
+# 进程内共享的Qdrant客户端，按(url, prefer_grpc)复用同一条多路复用连接
+_shared_clients: Dict[Tuple[str, bool], "QdrantClient"] = {}
+_shared_clients_lock = threading.Lock()
+
+
+def _create_client(qdrant_url: str, prefer_grpc: bool) -> "QdrantClient":
+    """根据URL创建Qdrant客户端"""
+    if qdrant_url.startswith('http'):
+        # HTTP连接
+        url_parts = qdrant_url.replace('http://', '').replace('https://', '')
+        if ':' in url_parts:
+            host, port = url_parts.split(':')
+            port = int(port)
+        else:
+            host = url_parts
+            port = 6333
+        
+        # gRPC传输避免大向量的JSON编解码，并复用HTTP/2长连接
+        return QdrantClient(
+            host=host,
+            port=port,
+            grpc_port=config.qdrant_grpc_port,
+            prefer_grpc=prefer_grpc,
+            https=qdrant_url.startswith('https'),
+            timeout=60,
+            grpc_options={
+                'grpc.max_send_message_length': GRPC_MAX_MESSAGE_LENGTH,
+                'grpc.max_receive_message_length': GRPC_MAX_MESSAGE_LENGTH
+            }
+        )
+    
+    # 本地文件存储
+    return QdrantClient(path=qdrant_url)
+
+
+def get_shared_client(qdrant_url: str, prefer_grpc: bool) -> "QdrantClient":
+    """获取共享的Qdrant客户端（不存在时创建）"""
+    key = (qdrant_url, prefer_grpc)
+    with _shared_clients_lock:
+        client = _shared_clients.get(key)
+        if client is None:
+            client = _create_client(qdrant_url, prefer_grpc)
+            _shared_clients[key] = client
+        return client
+
+
+if ORJSON_AVAILABLE:
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+    
+    def _json_dumps(value: Any) -> str:
+        """JSON编码（orjson默认输出UTF-8，不转义中文）"""
+        return orjson.dumps(value, option=_ORJSON_OPTIONS).decode('utf-8')
+    
+    _json_loads = orjson.loads
+else:
+    def _json_dumps(value: Any) -> str:
+        """JSON编码"""
+        return json.dumps(value, ensure_ascii=False)
+    
+    _json_loads = json.loads
+
+
+def _decode_payload(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    还原payload中JSON编码的字段（原地修改并返回）
+    
+    新写入的点按JSON_FIELDS_KEY列出的字段解码，并移除该标记；
+    标记出现之前写入的旧点没有该键，退回逐字段探测以'{'或'['开头的字符串，
+    解析失败时保留原值。
+    """
+    if payload is None:
+        return payload
+    
+    json_fields = payload.pop(JSON_FIELDS_KEY, None)
+    if json_fields is not None:
+        for key in json_fields:
+            if key in payload:
+                payload[key] = _json_loads(payload[key])
+        return payload
+    
+    # 旧数据：无标记，按内容探测
+    for key, value in payload.items():
+        if isinstance(value, str) and (value.startswith('{') or value.startswith('[')):
+            try:
+                payload[key] = _json_loads(value)
+            except ValueError:
+                pass
+    
+    return payload
+
+
+def _match_condition(field: str, value: Any) -> "models.FieldCondition":
+    """精确匹配条件"""
+    return models.FieldCondition(key=field, match=models.MatchValue(value=value))
+
+
+def _any_condition(field: str, value: List[Any]) -> "models.FieldCondition":
+    """多值匹配条件"""
+    return models.FieldCondition(key=field, match=models.MatchAny(any=value))
+
+
+def _range_condition(field: str, value: Dict[str, Any]) -> Optional["models.FieldCondition"]:
+    """范围条件，字符串边界按日期时间范围处理"""
+    if 'range' not in value:
+        return None
+    
+    range_condition = value['range']
+    gte = range_condition.get('gte')
+    lte = range_condition.get('lte')
+    
+    if isinstance(gte, (str, datetime)) or isinstance(lte, (str, datetime)):
+        return models.FieldCondition(key=field, range=models.DatetimeRange(gte=gte, lte=lte))
+    return models.FieldCondition(key=field, range=models.Range(gte=gte, lte=lte))
+
+
+# 过滤条件值类型 -> FieldCondition构造函数
+_CONDITION_BUILDERS = {
+    str: _match_condition,
+    int: _match_condition,
+    float: _match_condition,
+    bool: _match_condition,
+    list: _any_condition,
+    dict: _range_condition
+}
+
+
+def _condition_builder(value: Any):
+    """按值类型查找构造函数：先精确匹配，找不到时沿MRO匹配子类（如str/int枚举）"""
+    value_type = type(value)
+    builder = _CONDITION_BUILDERS.get(value_type)
+    if builder is None:
+        for base in value_type.__mro__[1:]:
+            builder = _CONDITION_BUILDERS.get(base)
+            if builder is not None:
+                break
+    return builder
+
+
+def _build_filter_uncached(conditions: Dict[str, Any]) -> "models.Filter":
+    """根据条件字典构建过滤器，遇到不支持的值类型时抛出ValueError"""
+    must_conditions = []
+    
+    for field, value in conditions.items():
+        # numpy标量转换为对应的Python标量
+        if isinstance(value, np.generic):
+            value = value.item()
+        
+        builder = _condition_builder(value)
+        if builder is None:
+            # 忽略条件会返回未过滤的结果，宁可报错
+            raise ValueError(f"不支持的过滤条件类型: {field}={type(value).__name__}")
+        
+        condition = builder(field, value)
+        if condition is not None:
+            must_conditions.append(condition)
+    
+    return models.Filter(must=must_conditions)
+
+
+def _freeze_value(value: Any) -> Any:
+    """将条件值转换为可哈希形式（保留类型信息，避免列表与字典混淆）"""
+    if isinstance(value, list):
+        return (list, tuple(_freeze_value(v) for v in value))
+    if isinstance(value, dict):
+        return (dict, tuple(sorted((k, _freeze_value(v)) for k, v in value.items())))
+    return (type(value), value)
+
+
+def _freeze_conditions(conditions: Dict[str, Any]) -> Tuple:
+    """生成过滤条件的缓存键，值不可哈希时抛出TypeError"""
+    key = tuple(sorted((field, _freeze_value(value)) for field, value in conditions.items()))
+    hash(key)
+    return key
+
 
 class VectorStore:
     """向量存储器"""
@@ -32,7 +265,12 @@ class VectorStore:
     def __init__(self, 
                  qdrant_url: str = None,
                  collection_name: str = None,
-                 vector_dimension: int = None):
+                 vector_dimension: int = None,
+                 prefer_grpc: bool = None,
+                 hnsw_m: int = None,
+                 hnsw_ef_construct: int = None,
+                 bulk_load: bool = False,
+                 profile: Literal['ingest', 'qps', 'latency'] = None):
         """
         初始化向量存储器
         
@@ -40,13 +278,29 @@ class VectorStore:
             qdrant_url: Qdrant服务URL
             collection_name: 集合名称
             vector_dimension: 向量维度
+            prefer_grpc: 是否优先使用gRPC传输（默认取配置）
+            hnsw_m: HNSW图每个节点的连接数，越小构建越快、召回越低
+            hnsw_ef_construct: HNSW构建时的候选集大小
+            bulk_load: 批量导入模式，新建集合时暂不构建HNSW索引，
+                导入完成后需调用finalize_index()
+            profile: 优化器配置档（ingest/qps/latency，默认取配置）
         """
         self.qdrant_url = qdrant_url or config.qdrant_url
         self.collection_name = collection_name or config.qdrant_collection_name
         self.vector_dimension = vector_dimension or config.vector_dimension
+        self.prefer_grpc = config.qdrant_prefer_grpc if prefer_grpc is None else prefer_grpc
+        self.hnsw_m = hnsw_m or config.qdrant_hnsw_m
+        self.hnsw_ef_construct = hnsw_ef_construct or config.qdrant_hnsw_ef_construct
+        self.bulk_load = bulk_load
+        self.profile = profile or config.qdrant_optimizer_profile
+        if self.profile not in OPTIMIZER_PROFILES:
+            logger.warning(f"未知的优化器配置档: {self.profile}，使用qps")
+            self.profile = 'qps'
         
         self.client = None
         self.collection_exists = False
+        self._filter_cache: Dict[Tuple, Any] = {}
+        self._stats_cache: Tuple[float, Dict[str, Any]] = (0.0, {})
         
         # 初始化Qdrant客户端
         self._initialize_client()
@@ -63,21 +317,7 @@ class VectorStore:
             return
         
         try:
-            # 解析URL
-            if self.qdrant_url.startswith('http'):
-                # HTTP连接
-                url_parts = self.qdrant_url.replace('http://', '').replace('https://', '')
-                if ':' in url_parts:
-                    host, port = url_parts.split(':')
-                    port = int(port)
-                else:
-                    host = url_parts
-                    port = 6333
-                
-                self.client = QdrantClient(host=host, port=port)
-            else:
-                # 本地文件存储
-                self.client = QdrantClient(path=self.qdrant_url)
+            self.client = get_shared_client(self.qdrant_url, self.prefer_grpc)
             
             # 测试连接
             collections = self.client.get_collections()
@@ -140,32 +380,129 @@ class VectorStore:
             # 创建集合配置
             vectors_config = VectorParams(
                 size=self.vector_dimension,
-                distance=Distance.COSINE  # 使用余弦相似度
+                distance=Distance.COSINE,  # 使用余弦相似度
+                on_disk=config.qdrant_vectors_on_disk  # 原始FP32向量可放磁盘，内存只保留量化副本
             )
             
+            # INT8标量量化：内存占用约为FP32的1/4，量化副本常驻内存
+            quantization_config = None
+            if config.qdrant_scalar_quantization:
+                quantization_config = models.ScalarQuantization(
+                    scalar=models.ScalarQuantizationConfig(
+                        type=models.ScalarType.INT8,
+                        quantile=0.99,
+                        always_ram=True
+                    )
+                )
+            
+            optimizer_params = dict(OPTIMIZER_PROFILES[self.profile])
+            
+            if self.bulk_load:
+                # 批量导入：m=0关闭HNSW图构建，indexing_threshold=0暂停索引优化
+                hnsw_config = models.HnswConfigDiff(m=0, ef_construct=self.hnsw_ef_construct)
+                optimizer_params['indexing_threshold'] = 0
+            else:
+                # HNSW索引配置
+                hnsw_config = models.HnswConfigDiff(
+                    m=self.hnsw_m,
+                    ef_construct=self.hnsw_ef_construct
+                )
+            
+            optimizers_config = models.OptimizersConfigDiff(**optimizer_params)
+            
             # 创建集合
             self.client.create_collection(
                 collection_name=self.collection_name,
-                vectors_config=vectors_config
+                vectors_config=vectors_config,
+                hnsw_config=hnsw_config,
+                optimizers_config=optimizers_config,
+                quantization_config=quantization_config
             )
             
             self.collection_exists = True
             logger.info(f"集合 {self.collection_name} 创建成功")
             
+            # 为常用过滤字段建立payload索引
+            for field_name, field_type in FILTERABLE_PAYLOAD_INDEXES.items():
+                self.create_index(field_name, field_type)
+            
         except Exception as e:
             logger.error(f"集合创建失败: {str(e)}")
     
+    def finalize_index(self) -> bool:
+        """
+        批量导入完成后启用HNSW索引
+        
+        Returns:
+            是否成功
+        """
+        if not self.client or not self.collection_exists:
+            return False
+        
+        try:
+            self.client.update_collection(
+                collection_name=self.collection_name,
+                hnsw_config=models.HnswConfigDiff(
+                    m=self.hnsw_m,
+                    ef_construct=self.hnsw_ef_construct
+                ),
+                optimizers_config=models.OptimizersConfigDiff(
+                    indexing_threshold=OPTIMIZER_PROFILES[self.profile]['indexing_threshold']
+                )
+            )
+            self._invalidate_stats()
+            
+            logger.info(f"集合 {self.collection_name} HNSW索引已启用，后台开始构建")
+            return True
+            
+        except Exception as e:
+            logger.error(f"HNSW索引启用失败: {str(e)}")
+            return False
+    
+    def flush(self) -> bool:
+        """
+        写入屏障：等待此前所有wait=False写入被Qdrant应用后返回
+        
+        Qdrant按顺序应用同一集合上的更新，因此提交一个wait=True的空操作即可。
+        使用wait=False写入后，调用方必须先调用flush()才能假定数据可被查询。
+        """
+        if not self.client or not self.collection_exists:
+            return False
+        
+        try:
+            self.client.delete(
+                collection_name=self.collection_name,
+                points_selector=models.PointIdsList(points=[]),
+                wait=True
+            )
+            return True
+            
+        except Exception as e:
+            logger.error(f"写入屏障失败: {str(e)}")
+            return False
+    
+    def _invalidate_stats(self):
+        """写入后使集合信息缓存失效，避免统计返回写入前的点数"""
+        self._stats_cache = (0.0, {})
+    
     def store_vectors(self, 
                      vectors: np.ndarray,
                      documents: List[Dict[str, Any]],
-                     batch_size: int = 100) -> List[str]:
+                     batch_size: int = 100,
+                     upload_concurrency: int = 1) -> List[str]:
         """
         存储向量和对应的文档
         
+        使用qdrant-client的upload_collection流式上传：客户端内部负责分批和
+        失败重试，无需在Python侧逐点构造PointStruct。
+        
         Args:
             vectors: 向量矩阵 (n_docs, vector_dim)
             documents: 文档列表
             batch_size: 批处理大小
+            upload_concurrency: 并行上传的进程数。每次调用都会新建进程池，
+                仅当向量数超过 batch_size * upload_concurrency 时才启用；
+                本地文件存储模式下固定为1
             
         Returns:
             向量ID列表
@@ -180,105 +517,108 @@ class VectorStore:
         
         logger.info(f"开始存储 {len(vectors)} 个向量")
         
-        stored_ids = []
-        
         try:
-            # 分批存储
-            for i in range(0, len(vectors), batch_size):
-                batch_vectors = vectors[i:i + batch_size]
-                batch_documents = documents[i:i + batch_size]
-                
-                batch_ids = self._store_batch(batch_vectors, batch_documents)
-                stored_ids.extend(batch_ids)
-                
-                logger.info(f"已存储 {min(i + batch_size, len(vectors))}/{len(vectors)} 个向量")
+            # 预先生成ID，以便按输入顺序返回
+            point_ids = [str(uuid.uuid4()) for _ in documents]
             
-            logger.info(f"向量存储完成，成功存储 {len(stored_ids)} 个向量")
+            # 同一批文档共用一个存储时间戳
+            stored_at = datetime.now().isoformat()
             
-            return stored_ids
-            
-        except Exception as e:
-            logger.error(f"向量存储失败: {str(e)}")
-            return stored_ids
-    
-    def _store_batch(self, vectors: np.ndarray, documents: List[Dict[str, Any]]) -> List[str]:
-        """存储一批向量"""
-        points = []
-        batch_ids = []
-        
-        for vector, document in zip(vectors, documents):
-            # 生成唯一ID
-            point_id = str(uuid.uuid4())
-            batch_ids.append(point_id)
-            
-            # 准备payload（文档元数据）
-            payload = self._prepare_payload(document)
-            
-            # 创建点
-            point = PointStruct(
-                id=point_id,
-                vector=vector.tolist(),
-                payload=payload
-            )
+            # 多进程上传每次调用都要启动进程池，只有数据量足以分给每个进程至少一批时才值得；
+            # 本地文件存储不支持多进程上传
+            parallel = 1
+            if (upload_concurrency > 1 and self.qdrant_url.startswith('http')
+                    and len(vectors) > batch_size * upload_concurrency):
+                parallel = upload_concurrency
             
-            points.append(point)
-        
-        try:
-            # 批量插入
-            self.client.upsert(
+            self.client.upload_collection(
                 collection_name=self.collection_name,
-                points=points
+                vectors=np.ascontiguousarray(vectors, dtype=np.float32),
+                payload=(self._prepare_payload(document, stored_at) for document in documents),
+                ids=point_ids,
+                batch_size=batch_size,
+                parallel=parallel,
+                max_retries=3,
+                wait=False
             )
             
-            return batch_ids
+            # 各批次不等待落盘，结束时统一设置一次持久化屏障
+            self.flush()
+            
+            logger.info(f"向量存储完成，成功存储 {len(point_ids)} 个向量")
+            
+            return point_ids
             
         except Exception as e:
-            logger.error(f"批量存储失败: {str(e)}")
+            logger.error(f"向量存储失败: {str(e)}")
             return []
+        
+        finally:
+            # 失败时也可能已写入部分批次
+            self._invalidate_stats()
     
-    def _prepare_payload(self, document: Dict[str, Any]) -> Dict[str, Any]:
-        """准备文档payload"""
-        # 选择要存储的字段
-        payload_fields = [
-            'title', 'content', 'url', 'source', 'publish_time', 'crawl_time',
-            'news_type', 'industry', 'importance_level', 'investment_relevance',
-            'content_hash', 'word_count', 'importance_score'
-        ]
+    def _prepare_payload(self, document: Dict[str, Any], stored_at: str = None) -> Dict[str, Any]:
+        """
+        准备文档payload
         
+        Args:
+            document: 文档
+            stored_at: 存储时间戳，批量写入时由调用方统一传入
+        """
         payload = {}
+        json_fields = []
         
-        for field in payload_fields:
-            if field in document:
-                value = document[field]
-                
-                # 处理特殊类型
-                if isinstance(value, (datetime, )):
-                    payload[field] = value.isoformat()
-                elif isinstance(value, (list, dict)):
-                    payload[field] = json.dumps(value, ensure_ascii=False)
-                elif isinstance(value, (int, float, str, bool)):
-                    payload[field] = value
-                else:
-                    payload[field] = str(value)
+        for field, value in document.items():
+            if field not in PAYLOAD_FIELDS:
+                continue
+            
+            # 处理特殊类型（按常见程度排列）
+            if isinstance(value, (str, int, float, bool)):
+                payload[field] = value
+            elif isinstance(value, datetime):
+                payload[field] = value.isoformat()
+            elif isinstance(value, (list, dict)):
+                payload[field] = _json_dumps(value)
+                json_fields.append(field)
+            else:
+                payload[field] = str(value)
+        
+        # 记录JSON编码的字段，检索时按此列表解码，无需逐字段探测；
+        # 即使为空也写入，以便与没有标记的旧数据区分
+        payload[JSON_FIELDS_KEY] = json_fields
         
         # 添加存储时间戳
-        payload['stored_at'] = datetime.now().isoformat()
+        payload['stored_at'] = stored_at or datetime.now().isoformat()
         
         return payload
     
+    @staticmethod
+    def prepare_query_vector(query_vector: Union[np.ndarray, List[float]]) -> List[float]:
+        """
+        将查询向量转换为可直接提交的浮点列表
+        
+        对同一查询向量多次搜索（不同过滤条件、重排序等）时，调用方可先转换一次再复用，
+        避免每次搜索重复执行tolist()。
+        """
+        if isinstance(query_vector, list):
+            return query_vector
+        return np.ascontiguousarray(query_vector, dtype=np.float32).tolist()
+    
     def search_similar_vectors(self, 
-                             query_vector: np.ndarray,
+                             query_vector: Union[np.ndarray, List[float]],
                              limit: int = 10,
                              score_threshold: float = 0.0,
-                             filter_conditions: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+                             filter_conditions: Dict[str, Any] = None,
+                             hnsw_ef: int = None) -> List[Dict[str, Any]]:
         """
         搜索相似向量
         
         Args:
-            query_vector: 查询向量
+            query_vector: 查询向量（ndarray，或prepare_query_vector返回的列表）
             limit: 返回结果数量
             score_threshold: 相似度阈值
             filter_conditions: 过滤条件
+            hnsw_ef: 查询时HNSW候选集大小，越大召回越高、延迟越高
             
         Returns:
             相似文档列表
@@ -294,30 +634,15 @@ class VectorStore:
             # 执行搜索
             search_result = self.client.search(
                 collection_name=self.collection_name,
-                query_vector=query_vector.tolist(),
+                query_vector=self.prepare_query_vector(query_vector),
                 limit=limit,
                 score_threshold=score_threshold,
-                query_filter=query_filter
+                query_filter=query_filter,
+                search_params=self._build_search_params(hnsw_ef)
             )
             
             # 处理结果
-            results = []
-            for scored_point in search_result:
-                result = {
-                    'id': scored_point.id,
-                    'score': scored_point.score,
-                    'payload': scored_point.payload
-                }
-                
-                # 解析JSON字段
-                for key, value in result['payload'].items():
-                    if isinstance(value, str) and (value.startswith('{') or value.startswith('[')):
-                        try:
-                            result['payload'][key] = json.loads(value)
-                        except:
-                            pass
-                
-                results.append(result)
+            results = self._format_search_results(search_result)
             
             logger.debug(f"向量搜索完成，返回 {len(results)} 个结果")
             
@@ -327,42 +652,103 @@ class VectorStore:
             logger.error(f"向量搜索失败: {str(e)}")
             return []
     
-    def _build_filter(self, conditions: Dict[str, Any]) -> models.Filter:
-        """构建查询过滤器"""
-        must_conditions = []
-        
-        for field, value in conditions.items():
-            if isinstance(value, str):
-                condition = models.FieldCondition(
-                    key=field,
-                    match=models.MatchValue(value=value)
-                )
-            elif isinstance(value, (int, float)):
-                condition = models.FieldCondition(
-                    key=field,
-                    match=models.MatchValue(value=value)
-                )
-            elif isinstance(value, list):
-                condition = models.FieldCondition(
-                    key=field,
-                    match=models.MatchAny(any=value)
-                )
-            elif isinstance(value, dict) and 'range' in value:
-                # 范围查询
-                range_condition = value['range']
-                condition = models.FieldCondition(
-                    key=field,
-                    range=models.Range(
-                        gte=range_condition.get('gte'),
-                        lte=range_condition.get('lte')
-                    )
+    def search_similar_vectors_batch(self,
+                                     query_vectors: np.ndarray,
+                                     limit: int = 10,
+                                     score_threshold: float = 0.0,
+                                     filter_conditions: Dict[str, Any] = None,
+                                     hnsw_ef: int = None) -> List[List[Dict[str, Any]]]:
+        """
+        批量搜索相似向量（多个查询合并为一次请求）
+        
+        Args:
+            query_vectors: 查询向量矩阵 (n_queries, vector_dim)
+            limit: 每个查询返回结果数量
+            score_threshold: 相似度阈值
+            filter_conditions: 过滤条件（所有查询共用）
+            hnsw_ef: 查询时HNSW候选集大小
+            
+        Returns:
+            与查询向量一一对应的相似文档列表
+        """
+        if not self.client or not self.collection_exists:
+            logger.error("向量存储不可用")
+            return []
+        
+        try:
+            query_filter = self._build_filter(filter_conditions) if filter_conditions else None
+            search_params = self._build_search_params(hnsw_ef)
+            
+            # 整个矩阵一次性转换为列表
+            vector_lists = np.ascontiguousarray(query_vectors, dtype=np.float32).tolist()
+            
+            requests = [
+                models.SearchRequest(
+                    vector=vector_list,
+                    limit=limit,
+                    score_threshold=score_threshold,
+                    filter=query_filter,
+                    params=search_params,
+                    with_payload=True
                 )
-            else:
-                continue
+                for vector_list in vector_lists
+            ]
             
-            must_conditions.append(condition)
+            batch_result = self.client.search_batch(
+                collection_name=self.collection_name,
+                requests=requests
+            )
+            
+            results = [self._format_search_results(search_result) for search_result in batch_result]
+            
+            logger.debug(f"批量向量搜索完成，查询数: {len(results)}")
+            
+            return results
+            
+        except Exception as e:
+            logger.error(f"批量向量搜索失败: {str(e)}")
+            return []
+    
+    def _format_search_results(self, search_result) -> List[Dict[str, Any]]:
+        """将搜索返回的点转换为结果字典"""
+        results = []
+        for scored_point in search_result:
+            results.append({
+                'id': scored_point.id,
+                'score': scored_point.score,
+                'payload': _decode_payload(scored_point.payload)
+            })
+        
+        return results
+    
+    def _build_search_params(self, hnsw_ef: int = None) -> models.SearchParams:
+        """构建搜索参数"""
+        quantization = None
+        if config.qdrant_scalar_quantization:
+            # 先用INT8量化向量粗排，再用原始FP32向量重打分
+            quantization = models.QuantizationSearchParams(rescore=True)
+        
+        return models.SearchParams(
+            hnsw_ef=hnsw_ef or config.qdrant_hnsw_ef,
+            quantization=quantization
+        )
+    
+    def _build_filter(self, conditions: Dict[str, Any]) -> models.Filter:
+        """构建查询过滤器（相同条件复用已构建的Filter对象）"""
+        try:
+            cache_key = _freeze_conditions(conditions)
+        except TypeError:
+            # 条件中含不可哈希的值，直接构建
+            return _build_filter_uncached(conditions)
         
-        return models.Filter(must=must_conditions)
+        query_filter = self._filter_cache.get(cache_key)
+        if query_filter is None:
+            if len(self._filter_cache) >= FILTER_CACHE_SIZE:  # 缓存过大时清空
+                self._filter_cache.clear()
+            query_filter = _build_filter_uncached(conditions)
+            self._filter_cache[cache_key] = query_filter
+        
+        return query_filter
     
     def get_vector_by_id(self, vector_id: str) -> Optional[Dict[str, Any]]:
         """根据ID获取向量"""
@@ -382,7 +768,7 @@ class VectorStore:
                 return {
                     'id': point.id,
                     'vector': point.vector,
-                    'payload': point.payload
+                    'payload': _decode_payload(point.payload)
                 }
             
             return None
@@ -394,32 +780,49 @@ class VectorStore:
     def update_vector(self, vector_id: str, 
                      new_vector: np.ndarray = None,
                      new_payload: Dict[str, Any] = None) -> bool:
-        """更新向量"""
+        """
+        更新向量
+        
+        Args:
+            vector_id: 向量ID
+            new_vector: 新向量（为None时保留原向量）
+            new_payload: 新payload（为None时保留原payload）
+        """
         if not self.client or not self.collection_exists:
             return False
         
+        if new_vector is None and new_payload is None:
+            logger.warning(f"向量 {vector_id} 没有需要更新的内容")
+            return False
+        
         try:
-            # 获取现有向量
-            existing_point = self.get_vector_by_id(vector_id)
-            if not existing_point:
-                logger.error(f"向量 {vector_id} 不存在")
-                return False
-            
-            # 准备更新数据
-            update_vector = new_vector.tolist() if new_vector is not None else existing_point['vector']
-            update_payload = new_payload if new_payload is not None else existing_point['payload']
-            
-            # 更新向量
-            point = PointStruct(
-                id=vector_id,
-                vector=update_vector,
-                payload=update_payload
-            )
-            
-            self.client.upsert(
-                collection_name=self.collection_name,
-                points=[point]
-            )
+            # 按更新内容选择写入方式，无需先读取现有点
+            if new_vector is not None and new_payload is not None:
+                # 向量和payload都更新：整点覆盖
+                self.client.upsert(
+                    collection_name=self.collection_name,
+                    points=[PointStruct(
+                        id=vector_id,
+                        vector=self.prepare_query_vector(new_vector),
+                        payload=new_payload
+                    )]
+                )
+            elif new_payload is not None:
+                # 仅更新payload：整体替换，保持与原先整点覆盖一致的语义
+                self.client.overwrite_payload(
+                    collection_name=self.collection_name,
+                    payload=new_payload,
+                    points=[vector_id]
+                )
+            else:
+                # 仅更新向量
+                self.client.update_vectors(
+                    collection_name=self.collection_name,
+                    points=[models.PointVectors(
+                        id=vector_id,
+                        vector=self.prepare_query_vector(new_vector)
+                    )]
+                )
             
             logger.debug(f"向量 {vector_id} 更新成功")
             return True
@@ -427,6 +830,9 @@ class VectorStore:
         except Exception as e:
             logger.error(f"向量更新失败: {str(e)}")
             return False
+        
+        finally:
+            self._invalidate_stats()
     
     def delete_vector(self, vector_id: str) -> bool:
         """删除向量"""
@@ -447,12 +853,25 @@ class VectorStore:
         except Exception as e:
             logger.error(f"向量删除失败: {str(e)}")
             return False
+        
+        finally:
+            self._invalidate_stats()
     
-    def get_collection_info(self) -> Dict[str, Any]:
-        """获取集合信息"""
+    def get_collection_info(self, force_refresh: bool = False) -> Dict[str, Any]:
+        """
+        获取集合信息
+        
+        Args:
+            force_refresh: 忽略缓存，强制从Qdrant重新获取
+        """
         if not self.client or not self.collection_exists:
             return {}
         
+        # 统计数字变化不频繁，短时间内重复调用直接返回缓存
+        cached_at, cached_info = self._stats_cache
+        if not force_refresh and cached_info and time.monotonic() - cached_at < COLLECTION_INFO_TTL:
+            return dict(cached_info)
+        
         try:
             collection_info = self.client.get_collection(self.collection_name)
             
@@ -483,21 +902,35 @@ class VectorStore:
                 # 忽略向量配置获取失败
                 pass
             
-            return info
+            self._stats_cache = (time.monotonic(), info)
+            
+            return dict(info)
             
         except Exception as e:
             logger.error(f"获取集合信息失败: {str(e)}")
             return {}
     
     def create_index(self, field_name: str, field_type: str = "keyword") -> bool:
-        """创建字段索引"""
+        """
+        创建payload字段索引
+        
+        Args:
+            field_name: 字段名
+            field_type: 索引类型（keyword/integer/float/bool/datetime/text等）
+        """
         if not self.client or not self.collection_exists:
             return False
         
         try:
-            # Qdrant会自动为payload字段创建索引
-            # 这里可以添加特定的索引优化逻辑
-            logger.info(f"字段 {field_name} 索引创建请求已提交")
+            schema_type = models.PayloadSchemaType(field_type)
+            
+            self.client.create_payload_index(
+                collection_name=self.collection_name,
+                field_name=field_name,
+                field_schema=schema_type
+            )
+            
+            logger.info(f"字段 {field_name} 索引创建成功，类型: {field_type}")
             return True
             
         except Exception as e:
@@ -512,6 +945,7 @@ class VectorStore:
         try:
             # 删除集合
             self.client.delete_collection(self.collection_name)
+            self._invalidate_stats()
             
             # 重新创建集合
             self._create_collection()
@@ -523,12 +957,49 @@ class VectorStore:
             logger.error(f"集合清空失败: {str(e)}")
             return False
     
-    def backup_collection(self, backup_path: str) -> bool:
-        """备份集合"""
+    def backup_collection(self, backup_path: str, scroll_batch_size: int = 1024) -> bool:
+        """
+        备份集合
+        
+        通过scroll接口分批读取所有点，逐行写入JSON Lines文件
+        （每行包含id、vector、payload），内存占用不超过一批数据。
+        payload中JSON编码的字段按原始结构写出，不含内部标记。
+        
+        Args:
+            backup_path: 备份文件路径
+            scroll_batch_size: 每次scroll读取的点数
+        """
+        if not self.client or not self.collection_exists:
+            return False
+        
         try:
-            # 获取所有向量
-            # 注意：这是一个简化的备份方法，实际生产环境需要更复杂的备份策略
-            logger.warning("向量备份功能需要根据具体需求实现")
+            backed_up = 0
+            offset = None
+            
+            with open(backup_path, 'w', encoding='utf-8') as f:
+                while True:
+                    points, offset = self.client.scroll(
+                        collection_name=self.collection_name,
+                        limit=scroll_batch_size,
+                        offset=offset,
+                        with_vectors=True,
+                        with_payload=True
+                    )
+                    
+                    for point in points:
+                        f.write(_json_dumps({
+                            'id': point.id,
+                            'vector': point.vector,
+                            'payload': _decode_payload(point.payload)
+                        }))
+                        f.write('\n')
+                    
+                    backed_up += len(points)
+                    
+                    if not points or offset is None:
+                        break
+            
+            logger.info(f"集合 {self.collection_name} 备份完成，共 {backed_up} 个点: {backup_path}")
             return True
             
         except Exception as e:
@@ -542,7 +1013,12 @@ class VectorStore:
             'collection_exists': self.collection_exists,
             'collection_name': self.collection_name,
             'vector_dimension': self.vector_dimension,
-            'qdrant_url': self.qdrant_url
+            'qdrant_url': self.qdrant_url,
+            'prefer_grpc': self.prefer_grpc,
+            'hnsw_m': self.hnsw_m,
+            'hnsw_ef_construct': self.hnsw_ef_construct,
+            'bulk_load': self.bulk_load,
+            'profile': self.profile
         }
         
         if self.collection_exists:
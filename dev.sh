@@ -1912,5 +1912,7 @@ if [[ ! -f "PROJECT_MEMORY.md" ]]; then
     exit 1
 fi
 
-# 执行主函数
-main "$@"
+# 执行主函数（被 source 时只加载函数定义，由调用方自行调用 main）
+if [[ "${BASH_SOURCE[0]}" == "$0" ]]; then
+    main "$@"
+fi
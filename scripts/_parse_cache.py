@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+验证脚本共用的缓存工具
+- 文件内容按 (路径, mtime_ns, 大小) 在进程内缓存，文件变化后自动失效
+- 工具链 --version 探测按 (命令, 可执行文件路径, mtime_ns) 在进程内缓存，同一运行中每个二进制只启动一次
+- Python 包安装检查只用 find_spec，不导入；完整导入检查结果按解释器与 site-packages 状态缓存到磁盘，重复运行时跳过 torch 等重量级导入
+"""
+
+import os
+import sys
+import json
+import hashlib
+import site
+import sysconfig
+import functools
+import importlib.util
+import shutil
+import subprocess
+from pathlib import Path
+
+# 磁盘缓存目录
+CACHE_DIR = Path(os.getenv('QSOU_VERIFY_CACHE_DIR', Path.home() / '.cache' / 'qsou' / 'verify'))
+
+
+@functools.lru_cache(maxsize=128)
+def _read_text(path, mtime_ns, size):
+    with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+        return f.read()
+
+
+def read_text(path):
+    """读取文本文件；mtime 或大小未变化时直接返回缓存内容"""
+    st = os.stat(path)
+    return _read_text(os.path.abspath(path), st.st_mtime_ns, st.st_size)
+
+
+@functools.lru_cache(maxsize=None)
+def _probe_version(argv, path, mtime_ns):
+    result = subprocess.run((path,) + argv[1:], capture_output=True, text=True)
+    return result.returncode, result.stdout, result.stderr
+
+
+def probe_version(argv):
+    """
+    运行版本探测命令，返回 (返回码, stdout, stderr)
+
+    可执行文件升级后 mtime 变化，缓存自动失效；命令不存在时抛出 FileNotFoundError
+    """
+    argv = tuple(argv)
+    path = shutil.which(argv[0])
+    if path is None:
+        raise FileNotFoundError(argv[0])
+    path = os.path.realpath(path)
+    return _probe_version(argv, path, os.stat(path).st_mtime_ns)
+
+
+def _environment_key():
+    """当前解释器环境的指纹：解释器路径/版本 + site-packages 目录的 mtime（安装或卸载包会改变）"""
+    parts = [sys.executable, sys.version]
+    paths = sysconfig.get_paths()
+    for entry in sorted({paths['purelib'], paths['platlib'], site.getusersitepackages()}):
+        try:
+            parts.append(f"{entry}:{os.stat(entry).st_mtime_ns}")
+        except OSError:
+            continue
+    return hashlib.blake2b("\n".join(parts).encode('utf-8'), digest_size=16).hexdigest()
+
+
+def check_installed(packages):
+    """检查包是否已安装（importlib.util.find_spec，只查找不导入），返回 {包名: 是否安装}"""
+    results = {}
+    for package in packages:
+        try:
+            results[package] = importlib.util.find_spec(package) is not None
+        except (ImportError, ValueError):
+            results[package] = False
+    return results
+
+
+def check_imports(packages):
+    """
+    检查包能否真正导入（可发现安装损坏的包），返回 {包名: 是否成功}
+
+    结果按环境指纹缓存到磁盘，同一虚拟环境中重复运行时不再执行 __import__
+    """
+    cache_file = CACHE_DIR / f"imports-{_environment_key()}.json"
+    cached = {}
+    try:
+        cached = json.loads(cache_file.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        pass
+
+    results = {}
+    for package in packages:
+        if package in cached:
+            results[package] = cached[package]
+            continue
+        try:
+            __import__(package)
+            results[package] = True
+        except ImportError:
+            results[package] = False
+
+    if any(package not in cached for package in packages):
+        try:
+            CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            cached.update(results)
+            cache_file.write_text(json.dumps(cached), encoding='utf-8')
+        except OSError:
+            pass
+
+    return results
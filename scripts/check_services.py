@@ -4,7 +4,8 @@
 检查所有关键服务的运行状态
 """
 
-import requests
+import asyncio
+import httpx
 import psycopg2
 import redis
 from elasticsearch import Elasticsearch
@@ -16,73 +17,70 @@ import os
 load_dotenv()
 
 
-def check_service_status():
-    """检查所有服务状态"""
+def _check_postgres():
+    """检查 PostgreSQL"""
+    conn = psycopg2.connect(
+        host="localhost",
+        port=5432,
+        database="qsou_investment_intel",
+        user="qsou",
+        password="your_password",
+        connect_timeout=5
+    )
+    conn.close()
+    return '✅ 运行中'
+
+
+def _check_redis():
+    """检查 Redis"""
+    r = redis.Redis(host='localhost', port=6379, socket_connect_timeout=5)
+    r.ping()
+    return '✅ 运行中'
+
+
+def _check_elasticsearch():
+    """检查 Elasticsearch"""
+    es = Elasticsearch([{'host': 'localhost', 'port': 9200}])
+    if es.ping():
+        info = es.info()
+        return f"✅ 运行中 ({info['version']['number']})"
+    return '❌ 离线'
+
+
+def _check_qdrant():
+    """检查 Qdrant"""
+    client = QdrantClient(host="localhost", port=6333, timeout=5)
+    collections = client.get_collections()
+    return f"✅ 运行中 ({len(collections.collections)} 个集合)"
+
+
+async def _check_http(client, url):
+    """检查 HTTP 服务"""
+    response = await client.get(url)
+    if response.status_code == 200:
+        return '✅ 运行中'
+    return f"⚠️  响应异常 ({response.status_code})"
+
+
+async def check_service_status():
+    """检查所有服务状态（各项检查并发执行，总耗时取决于最慢的一项）"""
     print("📊 服务状态检查报告")
     print("=" * 40)
     
-    services_status = {}
-    
-    # 检查 PostgreSQL
-    try:
-        conn = psycopg2.connect(
-            host="localhost",
-            port=5432,
-            database="qsou_investment_intel",
-            user="qsou",
-            password="your_password"
-        )
-        conn.close()
-        services_status['PostgreSQL'] = '✅ 运行中'
-    except:
-        services_status['PostgreSQL'] = '❌ 离线'
-    
-    # 检查 Redis
-    try:
-        r = redis.Redis(host='localhost', port=6379)
-        r.ping()
-        services_status['Redis'] = '✅ 运行中'
-    except:
-        services_status['Redis'] = '❌ 离线'
+    async with httpx.AsyncClient(timeout=5) as client:
+        checks = {
+            'PostgreSQL': asyncio.to_thread(_check_postgres),
+            'Redis': asyncio.to_thread(_check_redis),
+            'Elasticsearch': asyncio.to_thread(_check_elasticsearch),
+            'Qdrant': asyncio.to_thread(_check_qdrant),
+            'API 服务': _check_http(client, 'http://localhost:8000/health'),
+            '前端服务': _check_http(client, 'http://localhost:3000'),
+        }
+        results = await asyncio.gather(*checks.values(), return_exceptions=True)
     
-    # 检查 Elasticsearch
-    try:
-        es = Elasticsearch([{'host': 'localhost', 'port': 9200}])
-        if es.ping():
-            info = es.info()
-            services_status['Elasticsearch'] = f"✅ 运行中 ({info['version']['number']})"
-        else:
-            services_status['Elasticsearch'] = '❌ 离线'
-    except:
-        services_status['Elasticsearch'] = '❌ 离线'
-    
-    # 检查 Qdrant
-    try:
-        client = QdrantClient(host="localhost", port=6333)
-        collections = client.get_collections()
-        services_status['Qdrant'] = f"✅ 运行中 ({len(collections.collections)} 个集合)"
-    except:
-        services_status['Qdrant'] = '❌ 离线'
-    
-    # 检查 API 服务
-    try:
-        response = requests.get('http://localhost:8000/health', timeout=5)
-        if response.status_code == 200:
-            services_status['API 服务'] = '✅ 运行中'
-        else:
-            services_status['API 服务'] = f"⚠️  响应异常 ({response.status_code})"
-    except:
-        services_status['API 服务'] = '❌ 离线'
-    
-    # 检查前端服务
-    try:
-        response = requests.get('http://localhost:3000', timeout=5)
-        if response.status_code == 200:
-            services_status['前端服务'] = '✅ 运行中'
-        else:
-            services_status['前端服务'] = f"⚠️  响应异常 ({response.status_code})"
-    except:
-        services_status['前端服务'] = '❌ 离线'
+    services_status = {}
+    for service, result in zip(checks, results):
+        services_status[service] = '❌ 离线' if isinstance(result, Exception) else result
     
     # 输出结果
     for service, status in services_status.items():
@@ -99,4 +97,4 @@ def check_service_status():
 
 
 if __name__ == "__main__":
-    check_service_status()
+    asyncio.run(check_service_status())
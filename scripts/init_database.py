@@ -4,15 +4,170 @@
 创建必要的数据库表和初始数据
 """
 
+import csv
+import io
 import os
 import sys
+from contextlib import contextmanager
+from datetime import date
 import psycopg2
+from psycopg2.pool import ThreadedConnectionPool
 from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
 from dotenv import load_dotenv
 
 # 加载环境变量
 load_dotenv()
 
+# 数据表定义: (表名, 说明, 建表语句)
+TABLE_DEFINITIONS = [
+    ('data_sources', '数据源', """
+    CREATE TABLE IF NOT EXISTS data_sources (
+        id SERIAL PRIMARY KEY,
+        name VARCHAR(100) NOT NULL UNIQUE,
+        base_url VARCHAR(500) NOT NULL,
+        source_type VARCHAR(50) NOT NULL,
+        is_active BOOLEAN DEFAULT TRUE,
+        crawl_frequency INTEGER DEFAULT 3600,
+        last_crawl_time TIMESTAMP,
+        robots_txt_url VARCHAR(500),
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    """),
+    ('documents', '文档', """
+    CREATE TABLE IF NOT EXISTS documents (
+        id SERIAL,
+        title VARCHAR(500) NOT NULL,
+        url VARCHAR(1000),
+        source_id INTEGER REFERENCES data_sources(id),
+        content_type VARCHAR(100),
+        publish_time TIMESTAMP,
+        crawl_time TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        content_hash VARCHAR(64),
+        elasticsearch_id VARCHAR(100),
+        qdrant_id INTEGER,
+        is_processed BOOLEAN DEFAULT FALSE,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (id, crawl_time)
+    ) PARTITION BY RANGE (crawl_time);
+    """),
+    # 分区表的唯一约束必须包含分区键，无法直接保证 url 全局唯一；
+    # 由非分区的查找表承担 URL 去重，documents 上的触发器负责同步
+    ('document_urls', '文档URL去重', """
+    CREATE TABLE IF NOT EXISTS document_urls (
+        url VARCHAR(1000) PRIMARY KEY,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    """),
+    ('users', '用户', """
+    CREATE TABLE IF NOT EXISTS users (
+        id SERIAL PRIMARY KEY,
+        username VARCHAR(100) NOT NULL UNIQUE,
+        email VARCHAR(255) NOT NULL UNIQUE,
+        hashed_password VARCHAR(255) NOT NULL,
+        is_active BOOLEAN DEFAULT TRUE,
+        is_admin BOOLEAN DEFAULT FALSE,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        last_login TIMESTAMP
+    );
+    """),
+    ('topic_monitors', '主题监控', """
+    CREATE TABLE IF NOT EXISTS topic_monitors (
+        id SERIAL PRIMARY KEY,
+        user_id INTEGER REFERENCES users(id),
+        topic_name VARCHAR(200) NOT NULL,
+        keywords TEXT[], 
+        is_active BOOLEAN DEFAULT TRUE,
+        alert_threshold FLOAT DEFAULT 0.8,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        last_check_time TIMESTAMP
+    );
+    """),
+    ('crawl_jobs', '爬虫任务', """
+    CREATE TABLE IF NOT EXISTS crawl_jobs (
+        id SERIAL,
+        source_id INTEGER REFERENCES data_sources(id),
+        job_status VARCHAR(50) DEFAULT 'pending',
+        start_time TIMESTAMP,
+        end_time TIMESTAMP,
+        items_scraped INTEGER DEFAULT 0,
+        items_failed INTEGER DEFAULT 0,
+        error_message TEXT,
+        job_metadata JSONB,
+        created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (id, created_at)
+    ) PARTITION BY RANGE (created_at);
+    """),
+    ('system_configs', '系统配置', """
+    CREATE TABLE IF NOT EXISTS system_configs (
+        id SERIAL PRIMARY KEY,
+        config_key VARCHAR(100) NOT NULL UNIQUE,
+        config_value TEXT,
+        description TEXT,
+        is_active BOOLEAN DEFAULT TRUE,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    """),
+]
+
+# 按月分区的大表: 表名 -> 预建分区的月数
+# 此处只在初始化时预建分区，生产环境可改用 pg_partman 自动滚动创建/清理分区
+PARTITIONED_TABLES = {
+    'documents': 12,
+    'crawl_jobs': 12,
+}
+
+# 分区存储参数：分区表本身不接受存储参数，需设置在各分区上。
+# 写入频繁的分区更早触发自动 ANALYZE，让统计信息跟上数据增长
+PARTITION_STORAGE_PARAMS = "autovacuum_analyze_scale_factor = 0.02"
+
+# documents 写入时在 document_urls 中登记 URL，重复 URL 触发主键冲突（与原 UNIQUE (url) 行为一致）；
+# 跨分区的 UPDATE 会被执行为 DELETE + INSERT，两种事件都会同步查找表
+DOCUMENT_URL_TRIGGER_DDL = """
+CREATE OR REPLACE FUNCTION documents_sync_url() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        DELETE FROM document_urls WHERE url = OLD.url;
+    ELSIF TG_OP = 'UPDATE' THEN
+        IF NEW.url IS DISTINCT FROM OLD.url THEN
+            DELETE FROM document_urls WHERE url = OLD.url;
+            IF NEW.url IS NOT NULL THEN
+                INSERT INTO document_urls (url) VALUES (NEW.url);
+            END IF;
+        END IF;
+    ELSIF NEW.url IS NOT NULL THEN
+        INSERT INTO document_urls (url) VALUES (NEW.url);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- 补登已有文档的 URL（重复执行初始化时）
+INSERT INTO document_urls (url)
+SELECT DISTINCT url FROM documents WHERE url IS NOT NULL
+ON CONFLICT (url) DO NOTHING;
+
+DROP TRIGGER IF EXISTS documents_url_unique ON documents;
+CREATE TRIGGER documents_url_unique
+    AFTER INSERT OR UPDATE OF url OR DELETE ON documents
+    FOR EACH ROW EXECUTE FUNCTION documents_sync_url();
+"""
+
+# 常用查询列索引: (索引名, 建索引语句)
+INDEX_DEFINITIONS = [
+    ('idx_documents_source_time',
+     "CREATE INDEX IF NOT EXISTS idx_documents_source_time ON documents (source_id, publish_time DESC);"),
+    ('idx_crawl_jobs_status',
+     "CREATE INDEX IF NOT EXISTS idx_crawl_jobs_status ON crawl_jobs (source_id, job_status);"),
+    ('idx_topic_monitors_user',
+     "CREATE INDEX IF NOT EXISTS idx_topic_monitors_user ON topic_monitors (user_id) WHERE is_active;"),
+    ('idx_topic_monitors_keywords',
+     "CREATE INDEX IF NOT EXISTS idx_topic_monitors_keywords ON topic_monitors USING GIN (keywords);"),
+]
+
+
 def create_database():
     """创建项目数据库"""
     try:
@@ -52,184 +207,170 @@ def create_database():
         return False
 
 
-def create_tables():
-    """创建数据表"""
+def create_connection_pool(minconn=1, maxconn=4):
+    """创建项目数据库连接池，各初始化阶段及并行种子加载复用已建立的连接"""
+    return ThreadedConnectionPool(
+        minconn,
+        maxconn,
+        host="localhost",
+        port=5432,
+        database="qsou_investment_intel",
+        user="qsou",
+        password="your_password"
+    )
+
+
+@contextmanager
+def pooled_connection(pool):
+    """从连接池借出连接，用完归还"""
+    conn = pool.getconn()
     try:
-        conn = psycopg2.connect(
-            host="localhost",
-            port=5432,
-            database="qsou_investment_intel",
-            user="qsou",
-            password="your_password"
+        yield conn
+    finally:
+        pool.putconn(conn)
+
+
+def monthly_partition_ddl(table, months, start=None):
+    """生成从 start 所在月起连续 months 个月的分区，以及兜底的 DEFAULT 分区"""
+    start = (start or date.today()).replace(day=1)
+    statements = []
+    year, month = start.year, start.month
+    for _ in range(months):
+        next_year, next_month = (year + 1, 1) if month == 12 else (year, month + 1)
+        statements.append(
+            f"CREATE TABLE IF NOT EXISTS {table}_y{year}m{month:02d} PARTITION OF {table} "
+            f"FOR VALUES FROM ('{year}-{month:02d}-01') TO ('{next_year}-{next_month:02d}-01') "
+            f"WITH ({PARTITION_STORAGE_PARAMS});"
         )
-        cursor = conn.cursor()
-        
-        # 创建数据源表
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS data_sources (
-                id SERIAL PRIMARY KEY,
-                name VARCHAR(100) NOT NULL UNIQUE,
-                base_url VARCHAR(500) NOT NULL,
-                source_type VARCHAR(50) NOT NULL,
-                is_active BOOLEAN DEFAULT TRUE,
-                crawl_frequency INTEGER DEFAULT 3600,
-                last_crawl_time TIMESTAMP,
-                robots_txt_url VARCHAR(500),
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            );
-        """)
-        print("✅ 创建数据源表成功")
-        
-        # 创建文档表
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS documents (
-                id SERIAL PRIMARY KEY,
-                title VARCHAR(500) NOT NULL,
-                url VARCHAR(1000) UNIQUE,
-                source_id INTEGER REFERENCES data_sources(id),
-                content_type VARCHAR(100),
-                publish_time TIMESTAMP,
-                crawl_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                content_hash VARCHAR(64),
-                elasticsearch_id VARCHAR(100),
-                qdrant_id INTEGER,
-                is_processed BOOLEAN DEFAULT FALSE,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            );
-        """)
-        print("✅ 创建文档表成功")
-        
-        # 创建用户表
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS users (
-                id SERIAL PRIMARY KEY,
-                username VARCHAR(100) NOT NULL UNIQUE,
-                email VARCHAR(255) NOT NULL UNIQUE,
-                hashed_password VARCHAR(255) NOT NULL,
-                is_active BOOLEAN DEFAULT TRUE,
-                is_admin BOOLEAN DEFAULT FALSE,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                last_login TIMESTAMP
-            );
-        """)
-        print("✅ 创建用户表成功")
-        
-        # 创建主题监控表
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS topic_monitors (
-                id SERIAL PRIMARY KEY,
-                user_id INTEGER REFERENCES users(id),
-                topic_name VARCHAR(200) NOT NULL,
-                keywords TEXT[], 
-                is_active BOOLEAN DEFAULT TRUE,
-                alert_threshold FLOAT DEFAULT 0.8,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                last_check_time TIMESTAMP
-            );
-        """)
-        print("✅ 创建主题监控表成功")
-        
-        # 创建爬虫任务表
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS crawl_jobs (
-                id SERIAL PRIMARY KEY,
-                source_id INTEGER REFERENCES data_sources(id),
-                job_status VARCHAR(50) DEFAULT 'pending',
-                start_time TIMESTAMP,
-                end_time TIMESTAMP,
-                items_scraped INTEGER DEFAULT 0,
-                items_failed INTEGER DEFAULT 0,
-                error_message TEXT,
-                job_metadata JSONB,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            );
-        """)
-        print("✅ 创建爬虫任务表成功")
-        
-        # 创建系统配置表
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS system_configs (
-                id SERIAL PRIMARY KEY,
-                config_key VARCHAR(100) NOT NULL UNIQUE,
-                config_value TEXT,
-                description TEXT,
-                is_active BOOLEAN DEFAULT TRUE,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            );
-        """)
-        print("✅ 创建系统配置表成功")
-        
-        # 提交事务
-        conn.commit()
-        cursor.close()
-        conn.close()
-        return True
-        
-    except psycopg2.Error as e:
-        print(f"❌ 数据表创建失败: {e}")
-        return False
+        year, month = next_year, next_month
+    statements.append(
+        f"CREATE TABLE IF NOT EXISTS {table}_default PARTITION OF {table} DEFAULT "
+        f"WITH ({PARTITION_STORAGE_PARAMS});"
+    )
+    return "\n".join(statements)
+
+
+def create_tables(pool):
+    """创建数据表"""
+    with pooled_connection(pool) as conn:
+        try:
+            cursor = conn.cursor()
 
+            # 所有建表语句合并为一次执行，只需一次往返
+            cursor.execute("\n".join(ddl for _, _, ddl in TABLE_DEFINITIONS))
+            print(f"✅ 创建数据表成功 ({len(TABLE_DEFINITIONS)} 张)")
 
-def insert_initial_data():
+            # 仅为确实是分区表的表建分区，兼容旧版本初始化出的普通表
+            cursor.execute(
+                "SELECT relname FROM pg_class WHERE relkind = 'p' AND relname = ANY(%s);",
+                (list(PARTITIONED_TABLES),)
+            )
+            partitioned = [row[0] for row in cursor.fetchall()]
+            if partitioned:
+                cursor.execute("\n".join(
+                    monthly_partition_ddl(table, PARTITIONED_TABLES[table]) for table in partitioned
+                ))
+                print(f"✅ 创建月分区成功 ({', '.join(partitioned)})")
+
+            # 保持 documents.url 全局唯一
+            cursor.execute(DOCUMENT_URL_TRIGGER_DDL)
+            print("✅ 创建文档URL去重触发器成功")
+
+            # 初始化时表为空，普通 CREATE INDEX 即可完成，无需 CONCURRENTLY（也不能在事务中使用）
+            cursor.execute("\n".join(ddl for _, ddl in INDEX_DEFINITIONS))
+            print(f"✅ 创建索引成功 ({len(INDEX_DEFINITIONS)} 个)")
+
+            # 提交事务
+            conn.commit()
+            cursor.close()
+            return True
+
+        except psycopg2.Error as e:
+            conn.rollback()
+            print(f"❌ 数据表创建失败: {e}")
+            return False
+
+
+def copy_seed_rows(cursor, table, columns, rows, conflict_column):
+    """
+    通过 COPY 批量写入种子数据
+    
+    先 COPY 到临时暂存表，再 INSERT ... SELECT ... ON CONFLICT DO NOTHING 写入目标表，
+    既获得 COPY 的流式吞吐，又保持重复执行时的幂等性。
+    """
+    stage = f"{table}_seed_stage"
+    column_list = ", ".join(columns)
+    
+    # 仅复制列结构，不继承默认值，避免暂存行消耗 SERIAL 序列
+    cursor.execute(f"""
+        CREATE TEMP TABLE {stage} ON COMMIT DROP AS
+        SELECT {column_list} FROM {table} WITH NO DATA;
+    """)
+    
+    buf = io.StringIO()
+    csv.writer(buf).writerows(rows)
+    buf.seek(0)
+    cursor.copy_expert(f"COPY {stage} ({column_list}) FROM STDIN WITH (FORMAT csv)", buf)
+    
+    cursor.execute(f"""
+        INSERT INTO {table} ({column_list})
+        SELECT {column_list} FROM {stage}
+        ON CONFLICT ({conflict_column}) DO NOTHING;
+    """)
+
+
+def insert_initial_data(pool):
     """插入初始数据"""
-    try:
-        conn = psycopg2.connect(
-            host="localhost",
-            port=5432,
-            database="qsou_investment_intel",
-            user="qsou",
-            password="your_password"
-        )
-        cursor = conn.cursor()
-        
-        # 插入初始数据源
-        initial_sources = [
-            ('新浪财经', 'https://finance.sina.com.cn/', 'news', True, 1800),
-            ('东方财富', 'https://www.eastmoney.com/', 'news', True, 1800),
-            ('证券时报', 'https://www.stcn.com/', 'news', True, 3600),
-            ('上交所公告', 'http://www.sse.com.cn/', 'announcement', True, 300),
-            ('深交所公告', 'http://www.szse.cn/', 'announcement', True, 300),
-        ]
-        
-        for name, url, source_type, is_active, frequency in initial_sources:
-            cursor.execute("""
-                INSERT INTO data_sources (name, base_url, source_type, is_active, crawl_frequency)
-                VALUES (%s, %s, %s, %s, %s)
-                ON CONFLICT (name) DO NOTHING;
-            """, (name, url, source_type, is_active, frequency))
-        
-        print("✅ 插入初始数据源成功")
-        
-        # 插入系统配置
-        initial_configs = [
-            ('elasticsearch_index_prefix', 'qsou_', 'Elasticsearch索引前缀'),
-            ('qdrant_collection_name', 'investment_documents', 'Qdrant集合名称'),
-            ('max_crawl_depth', '3', '最大爬取深度'),
-            ('min_content_length', '100', '最小内容长度'),
-            ('duplicate_threshold', '0.9', '重复内容阈值'),
-        ]
-        
-        for key, value, desc in initial_configs:
-            cursor.execute("""
-                INSERT INTO system_configs (config_key, config_value, description)
-                VALUES (%s, %s, %s)
-                ON CONFLICT (config_key) DO NOTHING;
-            """, (key, value, desc))
-        
-        print("✅ 插入系统配置成功")
-        
-        # 提交事务
-        conn.commit()
-        cursor.close()
-        conn.close()
-        return True
-        
-    except psycopg2.Error as e:
-        print(f"❌ 初始数据插入失败: {e}")
-        return False
+    with pooled_connection(pool) as conn:
+        try:
+            cursor = conn.cursor()
+
+            # 插入初始数据源
+            initial_sources = [
+                ('新浪财经', 'https://finance.sina.com.cn/', 'news', True, 1800),
+                ('东方财富', 'https://www.eastmoney.com/', 'news', True, 1800),
+                ('证券时报', 'https://www.stcn.com/', 'news', True, 3600),
+                ('上交所公告', 'http://www.sse.com.cn/', 'announcement', True, 300),
+                ('深交所公告', 'http://www.szse.cn/', 'announcement', True, 300),
+            ]
+
+            copy_seed_rows(
+                cursor, 'data_sources',
+                ('name', 'base_url', 'source_type', 'is_active', 'crawl_frequency'),
+                initial_sources, 'name'
+            )
+
+            print("✅ 插入初始数据源成功")
+
+            # 插入系统配置
+            initial_configs = [
+                ('elasticsearch_index_prefix', 'qsou_', 'Elasticsearch索引前缀'),
+                ('qdrant_collection_name', 'investment_documents', 'Qdrant集合名称'),
+                ('max_crawl_depth', '3', '最大爬取深度'),
+                ('min_content_length', '100', '最小内容长度'),
+                ('duplicate_threshold', '0.9', '重复内容阈值'),
+            ]
+
+            copy_seed_rows(
+                cursor, 'system_configs',
+                ('config_key', 'config_value', 'description'),
+                initial_configs, 'config_key'
+            )
+
+            print("✅ 插入系统配置成功")
+
+            # 立即收集统计信息，避免首批查询按默认估算生成执行计划
+            cursor.execute("ANALYZE data_sources; ANALYZE system_configs;")
+
+            # 提交事务
+            conn.commit()
+            cursor.close()
+            return True
+
+        except psycopg2.Error as e:
+            conn.rollback()
+            print(f"❌ 初始数据插入失败: {e}")
+            return False
 
 
 def main():
@@ -242,25 +383,34 @@ def main():
         print("❌ 数据库创建失败，退出...")
         sys.exit(1)
     
-    # 创建数据表
-    if not create_tables():
-        print("❌ 数据表创建失败，退出...")
+    # 建表和插入初始数据从同一连接池借用连接，避免重复握手认证
+    try:
+        pool = create_connection_pool()
+    except psycopg2.Error as e:
+        print(f"❌ 连接项目数据库失败: {e}")
         sys.exit(1)
     
-    # 插入初始数据
-    if not insert_initial_data():
-        print("❌ 初始数据插入失败，退出...")
-        sys.exit(1)
+    try:
+        # 创建数据表
+        if not create_tables(pool):
+            print("❌ 数据表创建失败，退出...")
+            sys.exit(1)
+        
+        # 插入初始数据
+        if not insert_initial_data(pool):
+            print("❌ 初始数据插入失败，退出...")
+            sys.exit(1)
+    finally:
+        pool.closeall()
     
     print("=" * 50)
     print("🎉 数据库初始化完成！")
     print("\n📋 创建的表:")
-    print("  - data_sources (数据源)")
-    print("  - documents (文档)")
-    print("  - users (用户)")
-    print("  - topic_monitors (主题监控)")
-    print("  - crawl_jobs (爬虫任务)")
-    print("  - system_configs (系统配置)")
+    for table_name, label, _ in TABLE_DEFINITIONS:
+        print(f"  - {table_name} ({label})")
+    print("\n📋 创建的索引:")
+    for index_name, _ in INDEX_DEFINITIONS:
+        print(f"  - {index_name}")
     
     return True
 
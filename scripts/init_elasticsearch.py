@@ -7,20 +7,33 @@ Elasticsearch 初始化脚本
 import os
 import sys
 import json
-from elasticsearch import Elasticsearch
+from elasticsearch import BadRequestError, Elasticsearch
 from dotenv import load_dotenv
 
 # 加载环境变量
 load_dotenv()
 
+INDEX_TEMPLATE_NAME = 'qsou-investment-template'
+COMPONENT_TEMPLATE_NAME = 'qsou-investment-settings'
+
 
 def connect_elasticsearch():
     """连接 Elasticsearch"""
     try:
-        es = Elasticsearch([{
-            'host': os.getenv('ELASTICSEARCH_HOST', 'localhost'),
-            'port': int(os.getenv('ELASTICSEARCH_PORT', 9200))
-        }])
+        # 启用 gzip 压缩并放大连接池，各阶段复用同一客户端的长连接；
+        # 仅在多节点集群中开启启动时节点嗅探
+        es = Elasticsearch(
+            hosts=[{
+                'host': os.getenv('ELASTICSEARCH_HOST', 'localhost'),
+                'port': int(os.getenv('ELASTICSEARCH_PORT', 9200)),
+                'scheme': 'http'
+            }],
+            http_compress=True,
+            connections_per_node=25,
+            request_timeout=10,
+            retry_on_timeout=True,
+            sniff_on_start=os.getenv('ELASTICSEARCH_SNIFF_ON_START', 'false').lower() == 'true'
+        )
         
         # 测试连接
         if not es.ping():
@@ -47,10 +60,22 @@ def create_index_template(es):
         with open(template_path, 'r', encoding='utf-8') as f:
             template_config = json.load(f)
         
-        # 创建索引模板
+        # settings/mappings 作为组件模板，可被其他索引模板复用
+        es.cluster.put_component_template(
+            name=COMPONENT_TEMPLATE_NAME,
+            template=template_config['template'],
+            version=template_config.get('version'),
+            meta=template_config.get('_meta')
+        )
+        
+        # 组合索引模板覆盖 qsou_*，索引在首次写入时按模板自动创建
         es.indices.put_index_template(
-            name='qsou-investment-template',
-            body=template_config
+            name=INDEX_TEMPLATE_NAME,
+            index_patterns=template_config['index_patterns'],
+            composed_of=[COMPONENT_TEMPLATE_NAME],
+            priority=template_config.get('priority', 100),
+            version=template_config.get('version'),
+            meta=template_config.get('_meta')
         )
         
         print("✅ 索引模板创建成功")
@@ -64,20 +89,19 @@ def create_index_template(es):
 def create_indices(es):
     """创建基础索引"""
     try:
+        # 其余索引 (news/announcements/reports) 由模板在首次写入时创建，
+        # 这里只显式创建默认的通用文档索引
         prefix = os.getenv('ELASTICSEARCH_INDEX_PREFIX', 'qsou_')
-        indices = [
-            f'{prefix}news',           # 财经新闻
-            f'{prefix}announcements',  # 公司公告
-            f'{prefix}reports',        # 研究报告
-            f'{prefix}documents'       # 通用文档
-        ]
-        
-        for index_name in indices:
-            if not es.indices.exists(index=index_name):
-                es.indices.create(index=index_name)
-                print(f"✅ 创建索引: {index_name}")
-            else:
-                print(f"ℹ️  索引已存在: {index_name}")
+        index_name = f'{prefix}documents'
+        
+        try:
+            es.indices.create(index=index_name)
+            print(f"✅ 创建索引: {index_name}")
+        except BadRequestError as e:
+            # 只忽略索引已存在，其他 400 错误（如映射或设置非法）照常报告
+            if e.error != 'resource_already_exists_exception':
+                raise
+            print(f"ℹ️  索引已存在: {index_name}")
         
         return True
         
@@ -90,6 +114,7 @@ def create_ingest_pipelines(es):
     """创建数据处理管道"""
     try:
         # 创建文本处理管道
+        # word_count / reading_time 由写入方（数据清洗阶段）预先计算，管道中不再运行脚本
         pipeline_config = {
             "description": "Qsou投资情报文档处理管道",
             "processors": [
@@ -99,22 +124,10 @@ def create_ingest_pipelines(es):
                         "value": "{{_ingest.timestamp}}"
                     }
                 },
-                {
-                    "script": {
-                        "description": "计算阅读时间 (按250词/分钟)",
-                        "source": """
-                        if (ctx.content != null) {
-                            int wordCount = ctx.content.length() / 5;
-                            ctx.word_count = wordCount;
-                            ctx.reading_time = Math.max(1, Math.round(wordCount / 250.0));
-                        }
-                        """
-                    }
-                },
                 {
                     "remove": {
                         "field": ["content_raw"],
-                        "ignore_missing": true
+                        "ignore_missing": True
                     }
                 }
             ]
@@ -137,7 +150,7 @@ def verify_setup(es):
     """验证设置"""
     try:
         # 检查索引模板
-        templates = es.indices.get_index_template(name='qsou-investment-template')
+        templates = es.indices.get_index_template(name=INDEX_TEMPLATE_NAME)
         if templates['index_templates']:
             print("✅ 索引模板验证通过")
         
@@ -151,6 +164,18 @@ def verify_setup(es):
         if pipeline:
             print("✅ 数据处理管道验证通过")
         
+        return True
+        
+    except Exception as e:
+        print(f"❌ 验证失败: {e}")
+        return False
+
+
+def verify_search_roundtrip(es):
+    """写入-搜索-删除测试文档，端到端验证分词与管道（强制刷新，仅在显式要求时执行）"""
+    try:
+        prefix = os.getenv('ELASTICSEARCH_INDEX_PREFIX', 'qsou_')
+        
         # 插入测试文档
         test_doc = {
             "title": "Elasticsearch 测试文档",
@@ -161,18 +186,17 @@ def verify_setup(es):
             "publish_time": "2025-01-27 12:00:00"
         }
         
+        # 写入时等待刷新，省去单独的 refresh 请求
         result = es.index(
             index=f'{prefix}documents',
             body=test_doc,
-            pipeline='qsou-document-pipeline'
+            pipeline='qsou-document-pipeline',
+            refresh='wait_for'
         )
         
         if result['result'] == 'created':
             print("✅ 测试文档插入成功")
             
-            # 刷新索引
-            es.indices.refresh(index=f'{prefix}documents')
-            
             # 测试搜索
             search_result = es.search(
                 index=f'{prefix}documents',
@@ -231,15 +255,23 @@ def main():
         print("❌ 验证失败，退出...")
         sys.exit(1)
     
+    # 测试文档写入会强制刷新索引段，生产初始化默认跳过
+    if '--verify' in sys.argv or os.getenv('QSOU_INIT_VERIFY') == '1':
+        if not verify_search_roundtrip(es):
+            print("❌ 搜索验证失败，退出...")
+            sys.exit(1)
+    
     print("=" * 50)
     print("🎉 Elasticsearch 初始化完成！")
     print("\n📋 创建的资源:")
-    print("  - 索引模板: qsou-investment-template")
-    print("  - 索引: qsou_news, qsou_announcements, qsou_reports, qsou_documents")
+    print(f"  - 组件模板: {COMPONENT_TEMPLATE_NAME}")
+    print(f"  - 索引模板: {INDEX_TEMPLATE_NAME} (qsou_*)")
+    print("  - 索引: qsou_documents (qsou_news, qsou_announcements, qsou_reports 首次写入时自动创建)")
     print("  - 处理管道: qsou-document-pipeline")
     print("\n🔍 验证:")
     print(f"  访问 http://localhost:9200/_cat/indices/qsou_* 查看索引")
-    print(f"  访问 http://localhost:9200/_template/qsou-investment-template 查看模板")
+    print(f"  访问 http://localhost:9200/_index_template/{INDEX_TEMPLATE_NAME} 查看模板")
+    print("  运行 'python scripts/init_elasticsearch.py --verify' 执行写入/搜索端到端验证")
     
     return True
 
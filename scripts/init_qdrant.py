@@ -6,85 +6,178 @@ Qdrant 向量数据库初始化脚本
 
 import os
 import sys
+import argparse
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 from qdrant_client import QdrantClient
-from qdrant_client.models import Distance, VectorParams, PointStruct
+from qdrant_client.models import (
+    CollectionStatus, Distance, VectorParams,
+    ScalarQuantization, ScalarQuantizationConfig, ScalarType,
+    HnswConfigDiff, OptimizersConfigDiff, PointIdsList,
+    PayloadSchemaType, TextIndexParams, TextIndexType, TokenizerType,
+    QueryRequest, SearchParams, Filter, FieldCondition, MatchValue
+)
 from qdrant_client.http.exceptions import ResponseHandlingException
 from dotenv import load_dotenv
 
 # 加载环境变量
 load_dotenv()
 
+# HNSW 参数：构建期 m / ef_construct，查询期 ef（默认值与 data-processor/config.py 一致）
+HNSW_M = int(os.getenv('QDRANT_HNSW_M', 16))
+HNSW_EF_CONSTRUCT = int(os.getenv('QDRANT_HNSW_EF_CONSTRUCT', 100))
+HNSW_EF_SEARCH = int(os.getenv('QDRANT_HNSW_EF', 128))
+
+# 集合定义: (名称后缀, 说明, 覆盖默认配置的 create_collection 参数)
+COLLECTION_SPECS = [
+    ('', '主集合', {}),
+    ('_news', '新闻', {}),
+    ('_announcements', '公告', {}),
+]
+
+# 过滤/全文检索字段的 payload 索引: (字段名, 索引类型)
+# 标题和正文使用多语言分词器，按中文词切分而非按空格
+PAYLOAD_INDEXES = [
+    ('category', PayloadSchemaType.KEYWORD),
+    ('source', PayloadSchemaType.KEYWORD),
+    ('publish_time', PayloadSchemaType.DATETIME),
+    ('tags', PayloadSchemaType.KEYWORD),
+    ('title', TextIndexParams(type=TextIndexType.TEXT, tokenizer=TokenizerType.MULTILINGUAL)),
+    ('content', TextIndexParams(type=TextIndexType.TEXT, tokenizer=TokenizerType.MULTILINGUAL)),
+]
+
+# int8 标量量化，精确检索基准测试时可设置 QDRANT_SCALAR_QUANTIZATION=false 关闭
+SCALAR_QUANTIZATION = os.getenv('QDRANT_SCALAR_QUANTIZATION', 'true').lower() == 'true'
+
+# 原始 float32 向量与 HNSW 图是否落盘（与 data-processor 配置共用 QDRANT_VECTORS_ON_DISK）
+VECTORS_ON_DISK = os.getenv('QDRANT_VECTORS_ON_DISK', 'false').lower() == 'true'
+
+# 优化器配置档：与 data-processor/vector/vector_store.py 中的 OPTIMIZER_PROFILES 保持一致
+# （两边操作的是同一组集合），按 QDRANT_OPTIMIZER_PROFILE 选择
+INDEXING_THRESHOLD = 20_000
+OPTIMIZER_PROFILES = {
+    'qps': {
+        'default_segment_number': 2,
+        'indexing_threshold': INDEXING_THRESHOLD,
+        'max_optimization_threads': 2
+    },
+    'latency': {
+        'default_segment_number': 8,
+        'indexing_threshold': INDEXING_THRESHOLD
+    },
+    'ingest': {
+        'indexing_threshold': INDEXING_THRESHOLD
+    }
+}
+OPTIMIZER_PROFILE = os.getenv('QDRANT_OPTIMIZER_PROFILE', 'qps')
+
+# 超过该大小（KB）的段改为 mmap 存储
+MEMMAP_THRESHOLD = 20_000
+# 段大小上限（KB），须高于 mmap 与索引阈值，否则段达不到阈值、永远不会建索引或 mmap
+MAX_SEGMENT_SIZE = 200_000
+
 
 def connect_qdrant():
-    """连接 Qdrant"""
+    """连接 Qdrant，返回 (客户端, 已有集合名集合)"""
     try:
+        # 优先使用 gRPC：float32 向量直接按 protobuf 二进制传输，无需 JSON 序列化
         client = QdrantClient(
             host=os.getenv('QDRANT_HOST', 'localhost'),
-            port=int(os.getenv('QDRANT_PORT', 6333))
+            port=int(os.getenv('QDRANT_PORT', 6333)),
+            grpc_port=int(os.getenv('QDRANT_GRPC_PORT', 6334)),
+            prefer_grpc=True
         )
         
-        # 测试连接
+        # 测试连接，顺便取回已有集合供后续各阶段复用
         collections = client.get_collections()
-        print(f"✅ 已连接到 Qdrant，发现 {len(collections.collections)} 个集合")
-        return client
+        existing_names = {col.name for col in collections.collections}
+        print(f"✅ 已连接到 Qdrant，发现 {len(existing_names)} 个集合")
+        return client, existing_names
         
     except ResponseHandlingException as e:
         print(f"❌ Qdrant 连接失败: {e}")
-        return None
+        return None, None
     except Exception as e:
         print(f"❌ Qdrant 连接失败: {e}")
-        return None
+        return None, None
 
 
-def create_collections(client):
-    """创建向量集合"""
+def create_collections(client, existing_names):
+    """创建向量集合，并把新建的集合名加入 existing_names"""
     try:
         collection_name = os.getenv('QDRANT_COLLECTION_NAME', 'investment_documents')
         vector_dimension = int(os.getenv('EMBEDDING_DIMENSION', 768))
         
-        # 检查集合是否存在
-        collections = client.get_collections()
-        collection_names = [col.name for col in collections.collections]
+        # 只创建缺失的集合
+        missing_collections = []
+        for suffix, _, overrides in COLLECTION_SPECS:
+            name = f"{collection_name}{suffix}"
+            if name in existing_names:
+                print(f"ℹ️  集合 {name} 已存在")
+            else:
+                missing_collections.append((name, overrides))
         
-        if collection_name in collection_names:
-            print(f"ℹ️  集合 {collection_name} 已存在")
+        if not missing_collections:
             return True
-        else:
-            print(f"ℹ️  集合 {collection_name} 不存在，将创建新集合")
         
-        # 创建主要文档集合
-        client.create_collection(
-            collection_name=collection_name,
-            vectors_config=VectorParams(
-                size=vector_dimension,
-                distance=Distance.COSINE
+        quantization_config = ScalarQuantization(
+            scalar=ScalarQuantizationConfig(
+                type=ScalarType.INT8,
+                quantile=0.99,
+                always_ram=True
             )
-        )
+        ) if SCALAR_QUANTIZATION else None
         
-        print(f"✅ 创建集合: {collection_name} (维度: {vector_dimension})")
+        profile = OPTIMIZER_PROFILES.get(OPTIMIZER_PROFILE)
+        if profile is None:
+            print(f"⚠️  未知的优化器配置档: {OPTIMIZER_PROFILE}，使用 qps")
+            profile = OPTIMIZER_PROFILES['qps']
         
-        # 创建新闻集合（如果需要分类存储）
-        news_collection = f"{collection_name}_news"
-        client.create_collection(
-            collection_name=news_collection,
-            vectors_config=VectorParams(
-                size=vector_dimension,
-                distance=Distance.COSINE
-            )
+        optimizers_config = OptimizersConfigDiff(
+            max_segment_size=MAX_SEGMENT_SIZE,
+            memmap_threshold=MEMMAP_THRESHOLD,
+            flush_interval_sec=30,
+            **profile
         )
-        print(f"✅ 创建集合: {news_collection}")
         
-        # 创建公告集合
-        announcement_collection = f"{collection_name}_announcements"
-        client.create_collection(
-            collection_name=announcement_collection,
+        # 所有集合共用的默认配置，单个集合的差异写在 COLLECTION_SPECS 中
+        base_config = dict(
+            # 开启落盘时原始 float32 向量放磁盘，内存中仅保留 int8 量化副本用于检索
             vectors_config=VectorParams(
                 size=vector_dimension,
-                distance=Distance.COSINE
-            )
+                distance=Distance.COSINE,
+                on_disk=VECTORS_ON_DISK
+            ),
+            quantization_config=quantization_config,
+            # 开启落盘时 HNSW 图也走 mmap，由操作系统页缓存管理工作集
+            hnsw_config=HnswConfigDiff(
+                m=HNSW_M,
+                ef_construct=HNSW_EF_CONSTRUCT,
+                full_scan_threshold=10_000,
+                max_indexing_threads=2,
+                on_disk=VECTORS_ON_DISK
+            ),
+            optimizers_config=optimizers_config
         )
-        print(f"✅ 创建集合: {announcement_collection}")
+        
+        def create_collection(spec):
+            name, overrides = spec
+            client.create_collection(collection_name=name, **{**base_config, **overrides})
+            
+            # 建集合时同步建立 payload 索引，过滤条件走倒排而非逐点扫描
+            for field_name, field_schema in PAYLOAD_INDEXES:
+                client.create_payload_index(
+                    collection_name=name,
+                    field_name=field_name,
+                    field_schema=field_schema
+                )
+            return name
+        
+        # 并发创建，重叠各请求的网络往返
+        with ThreadPoolExecutor(max_workers=len(missing_collections)) as executor:
+            for name in executor.map(create_collection, missing_collections):
+                existing_names.add(name)
+                print(f"✅ 创建集合: {name} (维度: {vector_dimension}, payload 索引: {len(PAYLOAD_INDEXES)} 个)")
         
         return True
         
@@ -99,17 +192,9 @@ def create_test_vectors(client):
         collection_name = os.getenv('QDRANT_COLLECTION_NAME', 'investment_documents')
         vector_dimension = int(os.getenv('EMBEDDING_DIMENSION', 768))
         
-        # 创建测试向量数据
-        test_points = []
-        
-        # 测试文档1：关于股票的
-        stock_vector = np.random.rand(vector_dimension).astype(np.float32)
-        stock_vector = stock_vector / np.linalg.norm(stock_vector)  # 归一化
-        
-        test_points.append(PointStruct(
-            id=1,
-            vector=stock_vector.tolist(),
-            payload={
+        # 测试文档：股票、债券、基金
+        test_payloads = [
+            {
                 "title": "A股市场分析报告",
                 "content": "本报告分析了当前A股市场的投资机会和风险因素，包括宏观经济环境、政策影响等。",
                 "category": "股票分析",
@@ -117,17 +202,8 @@ def create_test_vectors(client):
                 "tags": ["股票", "A股", "市场分析"],
                 "publish_time": "2025-01-27T12:00:00Z",
                 "importance_score": 0.8
-            }
-        ))
-        
-        # 测试文档2：关于债券的
-        bond_vector = np.random.rand(vector_dimension).astype(np.float32)
-        bond_vector = bond_vector / np.linalg.norm(bond_vector)
-        
-        test_points.append(PointStruct(
-            id=2,
-            vector=bond_vector.tolist(),
-            payload={
+            },
+            {
                 "title": "企业债券投资策略",
                 "content": "分析企业债券市场的投资机会，包括信用风险评估和收益率预期。",
                 "category": "债券投资",
@@ -135,17 +211,8 @@ def create_test_vectors(client):
                 "tags": ["债券", "企业债", "投资策略"],
                 "publish_time": "2025-01-27T11:00:00Z",
                 "importance_score": 0.6
-            }
-        ))
-        
-        # 测试文档3：关于基金的
-        fund_vector = np.random.rand(vector_dimension).astype(np.float32)
-        fund_vector = fund_vector / np.linalg.norm(fund_vector)
-        
-        test_points.append(PointStruct(
-            id=3,
-            vector=fund_vector.tolist(),
-            payload={
+            },
+            {
                 "title": "基金定投策略研究",
                 "content": "探讨基金定投的优势和适合的市场环境，为投资者提供专业建议。",
                 "category": "基金投资",
@@ -153,16 +220,26 @@ def create_test_vectors(client):
                 "tags": ["基金", "定投", "投资策略"],
                 "publish_time": "2025-01-27T10:00:00Z",
                 "importance_score": 0.7
-            }
-        ))
+            },
+        ]
+        
+        # 标准正态采样后按行归一化，得到单位球面上均匀分布的测试向量
+        rng = np.random.default_rng(42)
+        vectors = rng.standard_normal((len(test_payloads), vector_dimension), dtype=np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
         
-        # 批量插入测试数据
-        client.upsert(
+        # 直接上传 float32 矩阵，无需逐点转换为 Python 列表；
+        # 不等待索引完成，服务端按 WAL 顺序流水线处理，后续删除仍按序生效
+        client.upload_collection(
             collection_name=collection_name,
-            points=test_points
+            vectors=vectors,
+            payload=test_payloads,
+            ids=list(range(1, len(test_payloads) + 1)),
+            batch_size=256,
+            wait=False
         )
         
-        print(f"✅ 插入 {len(test_points)} 个测试向量点")
+        print(f"✅ 插入 {len(test_payloads)} 个测试向量点")
         return True
         
     except Exception as e:
@@ -170,19 +247,19 @@ def create_test_vectors(client):
         return False
 
 
-def verify_setup(client):
+def verify_setup(client, existing_names):
     """验证设置"""
     try:
         collection_name = os.getenv('QDRANT_COLLECTION_NAME', 'investment_documents')
         
-        # 简单验证：检查集合是否存在
-        collections = client.get_collections()
-        collection_names = [col.name for col in collections.collections]
-        
-        if collection_name in collection_names:
-            print(f"✅ 集合 {collection_name} 验证通过")
-            print(f"✅ 总共创建了 {len(collection_names)} 个集合")
-            for name in collection_names:
+        # 简单验证：检查集合是否存在，并读取集合状态（只读，不产生写入）
+        if collection_name in existing_names:
+            info = client.get_collection(collection_name)
+            if info.status != CollectionStatus.GREEN:
+                print(f"⚠️  集合 {collection_name} 状态: {info.status}")
+            print(f"✅ 集合 {collection_name} 验证通过 (状态: {info.status}, 点数: {info.points_count})")
+            print(f"✅ 总共创建了 {len(existing_names)} 个集合")
+            for name in sorted(existing_names):
                 print(f"   - {name}")
             return True
         else:
@@ -194,6 +271,46 @@ def verify_setup(client):
         return False
 
 
+def verify_search(client):
+    """用测试向量验证检索（普通 + 过滤两个查询合并为一次批量请求）"""
+    try:
+        collection_name = os.getenv('QDRANT_COLLECTION_NAME', 'investment_documents')
+        vector_dimension = int(os.getenv('EMBEDDING_DIMENSION', 768))
+        
+        # 与 create_test_vectors 相同种子，首行即"A股市场分析报告"的向量
+        rng = np.random.default_rng(42)
+        query_vector = rng.standard_normal(vector_dimension, dtype=np.float32)
+        search_params = SearchParams(hnsw_ef=HNSW_EF_SEARCH)
+        
+        plain_result, filtered_result = client.query_batch_points(
+            collection_name=collection_name,
+            requests=[
+                QueryRequest(query=query_vector, limit=3, params=search_params, with_payload=True),
+                QueryRequest(
+                    query=query_vector,
+                    filter=Filter(must=[FieldCondition(key='category', match=MatchValue(value='股票分析'))]),
+                    limit=5,
+                    params=search_params,
+                    with_payload=True
+                ),
+            ]
+        )
+        
+        # 测试点异步写入，可能尚未全部可见，这里只提示不判定失败
+        if plain_result.points:
+            top = plain_result.points[0]
+            print(f"✅ 向量检索验证通过: {top.payload.get('title')} (相似度: {top.score:.4f})")
+        else:
+            print("⚠️  向量检索暂无结果，测试数据可能尚未写入完成")
+        
+        print(f"✅ 过滤检索返回 {len(filtered_result.points)} 条 (category=股票分析)")
+        return True
+        
+    except Exception as e:
+        print(f"❌ 检索验证失败: {e}")
+        return False
+
+
 def cleanup_test_data(client):
     """清理测试数据"""
     try:
@@ -202,7 +319,7 @@ def cleanup_test_data(client):
         # 删除测试点
         client.delete(
             collection_name=collection_name,
-            points_selector=[1, 2, 3]
+            points_selector=PointIdsList(points=[1, 2, 3])
         )
         
         print("✅ 测试数据清理完成")
@@ -215,39 +332,52 @@ def cleanup_test_data(client):
 
 def main():
     """主函数"""
+    parser = argparse.ArgumentParser(description='Qdrant 向量数据库初始化')
+    parser.add_argument('--with-test-data', action='store_true',
+                        help='写入测试向量验证检索后再删除（也可设置 QSOU_QDRANT_SMOKE=1）')
+    args = parser.parse_args()
+    
     print("🔮 开始初始化 Qdrant 向量数据库...")
     print("=" * 50)
     
     # 连接 Qdrant
-    client = connect_qdrant()
+    client, existing_names = connect_qdrant()
     if not client:
         sys.exit(1)
     
     # 创建集合
-    if not create_collections(client):
+    if not create_collections(client, existing_names):
         print("❌ 集合创建失败，退出...")
         sys.exit(1)
     
+    # 写入再删除测试点会触发段合并和 HNSW 更新，仅在冒烟测试时执行
+    smoke_test = args.with_test_data or os.getenv('QSOU_QDRANT_SMOKE') == '1'
+    
     # 创建测试数据
-    if not create_test_vectors(client):
+    if smoke_test and not create_test_vectors(client):
         print("❌ 测试数据创建失败，退出...")
         sys.exit(1)
     
     # 验证设置
-    if not verify_setup(client):
+    if not verify_setup(client, existing_names):
         print("❌ 验证失败，退出...")
         sys.exit(1)
     
+    # 检索验证
+    if smoke_test and not verify_search(client):
+        print("❌ 检索验证失败，退出...")
+        sys.exit(1)
+    
     # 清理测试数据
-    if not cleanup_test_data(client):
+    if smoke_test and not cleanup_test_data(client):
         print("⚠️  测试数据清理失败，但不影响功能")
     
     print("=" * 50)
     print("🎉 Qdrant 初始化完成！")
     print("\n📋 创建的集合:")
-    print("  - investment_documents (主集合)")
-    print("  - investment_documents_news (新闻)")
-    print("  - investment_documents_announcements (公告)")
+    collection_name = os.getenv('QDRANT_COLLECTION_NAME', 'investment_documents')
+    for suffix, label, _ in COLLECTION_SPECS:
+        print(f"  - {collection_name}{suffix} ({label})")
     print("\n🔍 验证:")
     print(f"  访问 http://localhost:6333/collections 查看集合列表")
     print(f"  使用 Qdrant Web UI: http://localhost:6333/dashboard")
@@ -6,32 +6,74 @@
 
 import os
 import sys
+import json
 import subprocess
 import time
+from collections import deque
+from contextlib import contextmanager
+
+# 命令输出中视为重要信息的关键字
+IMPORTANT_KEYWORDS = ('success', 'complete', 'created', '✅', '完成', '成功')
+# 命令失败时显示的最后输出行数
+ERROR_TAIL_LINES = 20
+# 各步骤耗时汇总输出位置，便于 CI 跟踪环境搭建耗时
+TIMINGS_FILE = os.path.join('logs', 'quick_start_timings.json')
+
+# 步骤名 -> 耗时(秒)
+step_timings = {}
+
+
+@contextmanager
+def step(name):
+    """记录并打印一个步骤的耗时"""
+    start = time.monotonic()
+    try:
+        yield
+    finally:
+        elapsed = time.monotonic() - start
+        step_timings[name] = round(elapsed, 3)
+        print(f"⏱  {name}: {elapsed:.2f}s")
+
+
+def save_timings():
+    """保存各步骤耗时"""
+    try:
+        os.makedirs(os.path.dirname(TIMINGS_FILE), exist_ok=True)
+        with open(TIMINGS_FILE, 'w', encoding='utf-8') as f:
+            json.dump(step_timings, f, ensure_ascii=False, indent=2)
+    except OSError as e:
+        print(f"⚠️  保存步骤耗时失败: {e}")
 
 
 def run_command(cmd, description, check_exit_code=True):
-    """运行命令并打印状态"""
+    """运行命令并打印状态；cmd 为列表时直接执行，不经过 shell"""
     print(f"🔄 {description}...")
     
     try:
-        result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
+        # 逐行读取输出，内存占用恒定；stderr 合并到 stdout，避免两个管道互相阻塞
+        proc = subprocess.Popen(
+            cmd, shell=isinstance(cmd, str), stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+            text=True, bufsize=1
+        )
         
-        if check_exit_code and result.returncode != 0:
+        important_lines = deque(maxlen=3)       # 只显示最后3条重要信息
+        recent_lines = deque(maxlen=ERROR_TAIL_LINES)
+        for line in proc.stdout:
+            line = line.rstrip()
+            recent_lines.append(line)
+            lowered = line.lower()
+            if any(keyword in lowered for keyword in IMPORTANT_KEYWORDS):
+                important_lines.append(line)
+        returncode = proc.wait()
+        
+        if check_exit_code and returncode != 0:
             print(f"❌ {description} 失败:")
-            print(result.stderr)
+            print("\n".join(recent_lines))
             return False
         else:
             print(f"✅ {description} 完成")
-            if result.stdout:
-                # 只显示重要信息，避免输出过多
-                lines = result.stdout.strip().split('\n')
-                important_lines = [line for line in lines if any(
-                    keyword in line.lower() for keyword in ['success', 'complete', 'created', '✅', '完成', '成功']
-                )]
-                if important_lines:
-                    for line in important_lines[-3:]:  # 只显示最后3条重要信息
-                        print(f"   {line}")
+            for line in important_lines:
+                print(f"   {line}")
             return True
             
     except Exception as e:
@@ -65,36 +107,52 @@ def main():
     
     # 步骤2: 创建虚拟环境（如果不存在）
     if not os.path.exists('venv'):
-        if not run_command('python -m venv venv', '创建Python虚拟环境'):
+        with step('创建虚拟环境'):
+            venv_created = run_command('python -m venv venv', '创建Python虚拟环境')
+        if not venv_created:
             sys.exit(1)
     
-    # 步骤3: 激活虚拟环境并安装依赖
-    activate_cmd = 'venv\\Scripts\\activate' if os.name == 'nt' else 'source venv/bin/activate'
-    pip_cmd = f'{activate_cmd} && pip install --upgrade pip && pip install -r requirements.txt'
+    # 步骤3: 直接调用虚拟环境中的 Python 安装依赖，无需启动 shell 激活环境
+    venv_python = os.path.join('venv', 'Scripts', 'python.exe') if os.name == 'nt' else os.path.join('venv', 'bin', 'python')
     
-    if not run_command(pip_cmd, '安装Python依赖包'):
+    with step('安装依赖'):
+        run_command(
+            [venv_python, '-m', 'pip', 'install', '--upgrade', '--disable-pip-version-check', 'pip'],
+            '升级pip', check_exit_code=False
+        )
+        deps_installed = run_command(
+            [venv_python, '-m', 'pip', 'install', '--prefer-binary', '--no-input',
+             '--disable-pip-version-check', '-r', 'requirements.txt'],
+            '安装Python依赖包'
+        )
+    if not deps_installed:
         print("⚠️  依赖包安装失败，请手动运行: pip install -r requirements.txt")
     
     # 步骤4: 创建配置文件
     if not os.path.exists('.env'):
         if os.path.exists('env.example'):
-            run_command('cp env.example .env' if os.name != 'nt' else 'copy env.example .env', 
-                       '创建环境配置文件', check_exit_code=False)
+            with step('创建配置文件'):
+                run_command('cp env.example .env' if os.name != 'nt' else 'copy env.example .env', 
+                           '创建环境配置文件', check_exit_code=False)
             print("📝 请编辑 .env 文件，配置数据库密码等参数")
         else:
             print("⚠️  env.example 文件不存在，请手动创建 .env 文件")
     
     # 步骤5: 创建必要目录
     directories = ['logs', 'data', 'backups']
-    for directory in directories:
-        if not os.path.exists(directory):
-            os.makedirs(directory)
-            print(f"✅ 创建目录: {directory}")
+    with step('创建目录'):
+        for directory in directories:
+            if not os.path.exists(directory):
+                os.makedirs(directory)
+                print(f"✅ 创建目录: {directory}")
     
     # 步骤6: 验证服务连接
-    verify_cmd = f'{activate_cmd} && python scripts/verify_setup.py'
+    verify_cmd = [venv_python, os.path.join('scripts', 'verify_setup.py')]
     print("\n🔍 验证服务连接...")
-    run_command(verify_cmd, '验证开发环境', check_exit_code=False)
+    with step('验证服务连接'):
+        run_command(verify_cmd, '验证开发环境', check_exit_code=False)
+    
+    save_timings()
     
     # 步骤7: 提供下一步指引
     print("\n" + "=" * 50)
@@ -9,10 +9,17 @@ import sys
 import time
 import subprocess
 import json
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import psutil
 import argparse
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 # Windows环境设置UTF-8编码
 if sys.platform == 'win32':
     os.environ['PYTHONIOENCODING'] = 'utf-8'
@@ -28,14 +35,47 @@ class ServiceManager:
         self.pid_dir = Path(pid_dir)
         self.pid_dir.mkdir(exist_ok=True)
         self.services = {}
+        # PID -> psutil.Process 缓存，复用句柄并使 cpu_percent 在两次采样间有效
+        self._proc_cache = {}
+        
+    def _get_process(self, pid):
+        """获取（缓存的）进程句柄，进程不存在时抛出 psutil.NoSuchProcess"""
+        process = self._proc_cache.get(pid)
+        # is_running() 会比对创建时间，PID 被复用时视为失效
+        if process is not None and process.is_running():
+            return process
+        self._proc_cache.pop(pid, None)
+        process = psutil.Process(pid)
+        self._proc_cache[pid] = process
+        return process
         
-    def register_service(self, name, pid):
+    def register_service(self, name, pid, cmd=None):
         """注册服务"""
         self.services[name] = pid
         pid_file = self.pid_dir / f"{name}.pid"
+        # PID文件保持纯文本，dev.sh 直接 cat 读取
         pid_file.write_text(str(pid))
+        # 启动时间、命令等元数据写入旁路文件
+        metadata = {'pid': pid, 'started': time.time(), 'cmd': cmd}
+        meta_file = self.pid_dir / f"{name}.meta.json"
+        if ORJSON_AVAILABLE:
+            meta_file.write_bytes(orjson.dumps(metadata))
+        else:
+            meta_file.write_text(json.dumps(metadata, ensure_ascii=False), encoding='utf-8')
         print(f"✓ 注册服务 {name} (PID: {pid})")
         
+    def get_service_metadata(self, name):
+        """获取服务元数据"""
+        meta_file = self.pid_dir / f"{name}.meta.json"
+        if meta_file.exists():
+            try:
+                if ORJSON_AVAILABLE:
+                    return orjson.loads(meta_file.read_bytes())
+                return json.loads(meta_file.read_text(encoding='utf-8'))
+            except (OSError, ValueError):
+                pass
+        return None
+        
     def unregister_service(self, name):
         """注销服务"""
         if name in self.services:
@@ -43,6 +83,9 @@ class ServiceManager:
         pid_file = self.pid_dir / f"{name}.pid"
         if pid_file.exists():
             pid_file.unlink()
+        meta_file = self.pid_dir / f"{name}.meta.json"
+        if meta_file.exists():
+            meta_file.unlink()
         print(f"✓ 注销服务 {name}")
         
     def get_service_pid(self, name):
@@ -55,15 +98,24 @@ class ServiceManager:
                 pass
         return None
         
+    def _load_all_pids(self):
+        """一次性读取所有PID文件，返回 {服务名: PID}"""
+        pids = {}
+        for pid_file in self.pid_dir.glob("*.pid"):
+            try:
+                pids[pid_file.stem] = int(pid_file.read_text().strip())
+            except (OSError, ValueError):
+                pass
+        return pids
+        
     def is_service_running(self, name):
         """检查服务是否运行"""
         pid = self.get_service_pid(name)
         if pid:
             try:
-                process = psutil.Process(pid)
-                return process.is_running()
+                return self._get_process(pid).is_running()
             except:
-                pass
+                self._proc_cache.pop(pid, None)
         return False
         
     def stop_service(self, name, timeout=10):
@@ -74,7 +126,7 @@ class ServiceManager:
             return True
             
         try:
-            process = psutil.Process(pid)
+            process = self._get_process(pid)
             print(f"停止服务 {name} (PID: {pid})...")
             
             # 发送终止信号
@@ -91,11 +143,13 @@ class ServiceManager:
                 process.wait(timeout=5)
                 print(f"✓ 服务 {name} 已强制停止")
                 
+            self._proc_cache.pop(pid, None)
             self.unregister_service(name)
             return True
             
         except psutil.NoSuchProcess:
             print(f"服务 {name} 进程不存在")
+            self._proc_cache.pop(pid, None)
             self.unregister_service(name)
             return True
         except Exception as e:
@@ -106,12 +160,12 @@ class ServiceManager:
         """停止所有服务"""
         print("停止所有服务...")
         
-        # 获取所有PID文件
-        pid_files = list(self.pid_dir.glob("*.pid"))
+        pids = self._load_all_pids()
         
-        for pid_file in pid_files:
-            service_name = pid_file.stem
-            self.stop_service(service_name)
+        # 各服务的终止互不依赖，并行停止，最坏耗时为单个服务的超时而非累加
+        if pids:
+            with ThreadPoolExecutor(max_workers=min(16, len(pids))) as executor:
+                list(executor.map(self.stop_service, pids))
             
         print("✓ 所有服务已停止")
         
@@ -132,31 +186,43 @@ class ServiceManager:
         print("\n服务状态:")
         print("-" * 40)
         
-        pid_files = list(self.pid_dir.glob("*.pid"))
+        pids = self._load_all_pids()
         
-        if not pid_files:
+        if not pids:
             print("没有运行中的服务")
             return
             
-        for pid_file in pid_files:
-            service_name = pid_file.stem
-            pid = self.get_service_pid(service_name)
+        self._prime_cpu_percent(pids.values())
             
-            if self.is_service_running(service_name):
-                try:
-                    process = psutil.Process(pid)
-                    cpu = process.cpu_percent(interval=0.1)
-                    mem = process.memory_info().rss / 1024 / 1024  # MB
-                    status = f"运行中 (CPU: {cpu:.1f}%, 内存: {mem:.1f}MB)"
-                except:
-                    status = "运行中"
-            else:
+        for service_name, pid in pids.items():
+            try:
+                process = self._get_process(pid)
+                cpu = process.cpu_percent(interval=None)
+                mem = process.memory_info().rss / 1024 / 1024  # MB
+                status = f"运行中 (CPU: {cpu:.1f}%, 内存: {mem:.1f}MB)"
+            except psutil.NoSuchProcess:
+                self._proc_cache.pop(pid, None)
                 status = "已停止（PID文件存在）"
+            except:
+                status = "运行中"
                 
             print(f"{service_name:<20} PID: {pid:<8} {status}")
             
         print("-" * 40)
         
+    def _prime_cpu_percent(self, pids):
+        """为尚未缓存的进程做首次 CPU 采样，所有进程共用一次 0.1 秒等待"""
+        primed = False
+        for pid in pids:
+            if pid not in self._proc_cache:
+                try:
+                    self._get_process(pid).cpu_percent(interval=None)
+                    primed = True
+                except psutil.Error:
+                    pass
+        if primed:
+            time.sleep(0.1)
+        
     def monitor_services(self, interval=5):
         """监控服务状态"""
         print(f"监控服务状态 (每{interval}秒刷新，按Ctrl+C退出)...")
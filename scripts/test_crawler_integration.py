@@ -8,8 +8,8 @@
 import os
 import sys
 import asyncio
-import requests
-import json
+import httpx
+import orjson
 from datetime import datetime
 from typing import Dict, Any
 
@@ -18,68 +18,88 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 project_root = os.path.dirname(current_dir)
 sys.path.insert(0, project_root)
 
-def test_api_connection():
+API_BASE_URL = "http://localhost:8000"
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+def create_client() -> httpx.AsyncClient:
+    """所有测试共用一个异步客户端，keep-alive 复用连接，连接失败自动重试"""
+    return httpx.AsyncClient(
+        base_url=API_BASE_URL,
+        timeout=30,
+        limits=httpx.Limits(max_connections=50, max_keepalive_connections=20),
+        transport=httpx.AsyncHTTPTransport(retries=3)
+    )
+
+async def check_api_connection(client: httpx.AsyncClient):
     """测试API连接"""
     print("🔍 测试API连接...")
     
     try:
         # 测试API网关健康检查
-        response = requests.get("http://localhost:8000/health", timeout=5)
+        response = await client.get("/health", timeout=5)
         if response.status_code == 200:
             print("✅ API网关连接正常")
             return True
         else:
             print(f"❌ API网关响应异常: {response.status_code}")
             return False
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         print(f"❌ API网关连接失败: {str(e)}")
         return False
 
-def test_data_processing_api():
+async def check_data_processing_api(client: httpx.AsyncClient):
     """测试数据处理API"""
     print("🔍 测试数据处理API...")
     
     try:
         # 测试数据处理API状态
-        response = requests.get("http://localhost:8000/api/v1/process/status", timeout=5)
+        response = await client.get("/api/v1/process/status", timeout=5)
         if response.status_code == 200:
-            status = response.json()
+            status = orjson.loads(response.content)
             print("✅ 数据处理API正常")
             print(f"   Celery连接: {status.get('celery_connected', False)}")
             return True
         else:
             print(f"❌ 数据处理API响应异常: {response.status_code}")
             return False
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         print(f"❌ 数据处理API连接失败: {str(e)}")
         return False
 
-def test_crawler_data_submission():
+async def check_crawler_data_submission(client: httpx.AsyncClient):
     """测试爬虫数据提交"""
     print("🔍 测试爬虫数据提交...")
     
+    # 两条测试数据使用同一时间戳和公共字段
+    now = datetime.now()
+    now_iso = now.isoformat()
+    base = {
+        "publish_time": now_iso,
+        "crawl_time": now_iso,
+        "content_length": 50,
+        "metadata": {
+            "crawler": "test_spider",
+            "domain": "example.com",
+            "language": "zh-CN"
+        }
+    }
+    
     # 创建测试数据
     test_documents = [
         {
+            **base,
             "id": "test_news_001",
             "type": "news",
             "title": "测试财经新闻标题",
             "content": "这是一条测试财经新闻内容，用于验证爬虫与数据处理系统的集成。内容包含投资、股票、市场等关键词。",
             "url": "https://example.com/news/001",
             "source": "test_source",
-            "publish_time": datetime.now().isoformat(),
             "author": "测试作者",
             "tags": ["财经", "股票", "投资"],
-            "category": "股票",
-            "crawl_time": datetime.now().isoformat(),
-            "content_length": 50,
-            "metadata": {
-                "crawler": "test_spider",
-                "domain": "example.com",
-                "language": "zh-CN"
-            }
+            "category": "股票"
         },
         {
+            **base,
             "id": "test_announcement_001",
             "type": "announcement",
             "title": "测试公司公告标题",
@@ -90,16 +110,8 @@ def test_crawler_data_submission():
             "company_name": "测试公司",
             "stock_code": "000001",
             "announcement_type": "财务报告",
-            "publish_time": datetime.now().isoformat(),
             "announcement_id": "TEST001",
-            "crawl_time": datetime.now().isoformat(),
-            "content_length": 50,
-            "is_important": True,
-            "metadata": {
-                "crawler": "test_spider",
-                "domain": "example.com",
-                "language": "zh-CN"
-            }
+            "is_important": True
         }
     ]
     
@@ -108,20 +120,21 @@ def test_crawler_data_submission():
         payload = {
             "documents": test_documents,
             "source": "test_crawler",
-            "batch_id": f"test_batch_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
+            "batch_id": f"test_batch_{now.strftime('%Y%m%d_%H%M%S')}",
             "enable_elasticsearch": True,
             "enable_vector_store": True,
             "enable_nlp_processing": True
         }
         
-        response = requests.post(
-            "http://localhost:8000/api/v1/process/process",
-            json=payload,
+        response = await client.post(
+            "/api/v1/process/process",
+            content=orjson.dumps(payload),
+            headers=JSON_HEADERS,
             timeout=30
         )
         
         if response.status_code == 200:
-            result = response.json()
+            result = orjson.loads(response.content)
             print("✅ 爬虫数据提交成功")
             print(f"   处理状态: {result.get('status')}")
             print(f"   处理数量: {result.get('processed_count')}")
@@ -133,11 +146,11 @@ def test_crawler_data_submission():
             print(f"   响应内容: {response.text}")
             return False
             
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         print(f"❌ 爬虫数据提交异常: {str(e)}")
         return False
 
-def test_search_functionality():
+async def check_search_functionality(client: httpx.AsyncClient):
     """测试搜索功能"""
     print("🔍 测试搜索功能...")
     
@@ -150,14 +163,15 @@ def test_search_functionality():
             "page_size": 10
         }
         
-        response = requests.post(
-            "http://localhost:8000/api/v1/search/",
-            json=search_payload,
+        response = await client.post(
+            "/api/v1/search/",
+            content=orjson.dumps(search_payload),
+            headers=JSON_HEADERS,
             timeout=10
         )
         
         if response.status_code == 200:
-            result = response.json()
+            result = orjson.loads(response.content)
             print("✅ 搜索功能正常")
             print(f"   搜索结果数量: {result.get('total_count', 0)}")
             print(f"   搜索时间: {result.get('search_time_ms', 0)}ms")
@@ -166,35 +180,41 @@ def test_search_functionality():
             print(f"❌ 搜索功能异常: {response.status_code}")
             return False
             
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         print(f"❌ 搜索功能测试失败: {str(e)}")
         return False
 
+async def run_test(test_name, test_func, client):
+    """执行单个测试，异常记为失败"""
+    print(f"📋 {test_name}")
+    try:
+        return test_name, await test_func(client)
+    except Exception as e:
+        print(f"❌ {test_name} 执行异常: {str(e)}")
+        return test_name, False
+
+async def run_all_tests():
+    """并发执行互不依赖的测试，搜索测试在数据提交之后执行"""
+    async with create_client() as client:
+        # API连接、数据处理API、数据提交三者互不依赖，并发执行重叠网络等待
+        results = list(await asyncio.gather(
+            run_test("API连接测试", check_api_connection, client),
+            run_test("数据处理API测试", check_data_processing_api, client),
+            run_test("爬虫数据提交测试", check_crawler_data_submission, client),
+        ))
+        print()
+        # 搜索依赖已提交数据完成索引，保持先提交后搜索的顺序
+        results.append(await run_test("搜索功能测试", check_search_functionality, client))
+        print()
+        return results
+
 def main():
     """主函数"""
     print("=== 爬虫集成测试 ===")
     print(f"测试时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print()
     
-    # 测试步骤
-    tests = [
-        ("API连接测试", test_api_connection),
-        ("数据处理API测试", test_data_processing_api),
-        ("爬虫数据提交测试", test_crawler_data_submission),
-        ("搜索功能测试", test_search_functionality)
-    ]
-    
-    results = []
-    
-    for test_name, test_func in tests:
-        print(f"📋 {test_name}")
-        try:
-            result = test_func()
-            results.append((test_name, result))
-        except Exception as e:
-            print(f"❌ {test_name} 执行异常: {str(e)}")
-            results.append((test_name, False))
-        print()
+    results = asyncio.run(run_all_tests())
     
     # 输出测试结果
     print("=== 测试结果汇总 ===")
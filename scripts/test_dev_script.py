@@ -5,35 +5,135 @@ dev.sh 脚本功能测试
 """
 
 import os
+import atexit
 import subprocess
 import time
 import sys
 import requests
 import signal
+import queue
+import shlex
+import tempfile
+import threading
 from pathlib import Path
 
-def run_command(cmd, timeout=30):
-    """运行命令并返回结果"""
-    try:
-        result = subprocess.run(
-            cmd, 
-            shell=True, 
-            capture_output=True, 
-            text=True, 
-            timeout=timeout
+from _parse_cache import probe_version, read_text
+
+# dev.sh 命令输出结束标记
+END_MARKER = "__DEV_SH_END__"
+
+
+class DevShell:
+    """
+    常驻 bash 进程：dev.sh 只加载一次，各测试通过管道发送命令
+
+    每条命令在子 shell 中执行，dev.sh 内的 exit / set -e 不会影响常驻进程
+    """
+    
+    def __init__(self, script="./dev.sh"):
+        self.script = script
+        self.proc = None
+        self.lines = None
+        fd, self.err_file = tempfile.mkstemp(prefix="dev_sh_", suffix=".err")
+        os.close(fd)
+        
+    def _start(self):
+        self.proc = subprocess.Popen(
+            ["bash"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            bufsize=1
         )
-        return result.returncode == 0, result.stdout, result.stderr
-    except subprocess.TimeoutExpired:
-        return False, "", "命令超时"
-    except Exception as e:
-        return False, "", str(e)
+        self.lines = queue.Queue()
+        threading.Thread(target=self._reader, args=(self.proc.stdout, self.lines), daemon=True).start()
+        # source 后 $0 为 "bash"，改回脚本路径，使用法提示与直接执行时一致（BASH_ARGV0 需 bash 5+）
+        self.proc.stdin.write(
+            f"source {shlex.quote(self.script)}\n"
+            f"BASH_ARGV0={shlex.quote(self.script)}\n"
+            "set +euo pipefail\n"
+        )
+        self.proc.stdin.flush()
+        
+    @staticmethod
+    def _reader(stream, lines):
+        for line in stream:
+            lines.put(line)
+        lines.put(None)
+        
+    def run(self, *args, timeout=30):
+        """执行 dev.sh 命令，返回 (是否成功, stdout, stderr)"""
+        try:
+            if self.proc is None or self.proc.poll() is not None:
+                self._start()
+            command = " ".join(shlex.quote(arg) for arg in args)
+            self.proc.stdin.write(
+                f"( set -euo pipefail; main {command} ) </dev/null 2>{shlex.quote(self.err_file)}; "
+                f"echo \"{END_MARKER} $?\"\n"
+            )
+            self.proc.stdin.flush()
+            
+            output = []
+            deadline = time.monotonic() + timeout
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise queue.Empty
+                line = self.lines.get(timeout=remaining)
+                if line is None:
+                    return False, "".join(output), "bash 进程意外退出"
+                if line.startswith(END_MARKER):
+                    returncode = int(line.split()[1])
+                    break
+                output.append(line)
+                
+            with open(self.err_file, "r", encoding="utf-8", errors="ignore") as f:
+                stderr = f.read()
+            return returncode == 0, "".join(output), stderr
+        except queue.Empty:
+            # 超时后丢弃当前进程，下一条命令重新启动
+            self.close(force=True)
+            return False, "", "命令超时"
+        except Exception as e:
+            return False, "", str(e)
+            
+    def close(self, force=False):
+        """结束常驻进程"""
+        if self.proc is not None:
+            if force:
+                self.proc.kill()
+            else:
+                try:
+                    self.proc.stdin.write("exit 0\n")
+                    self.proc.stdin.flush()
+                except OSError:
+                    pass
+            try:
+                self.proc.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.proc.kill()
+            self.proc = None
+        if not force and os.path.exists(self.err_file):
+            os.unlink(self.err_file)
+
+
+_dev_shell = None
+
+def get_dev_shell():
+    """首次使用时创建常驻 bash 进程（导入或被 pytest 收集时不创建临时文件），退出时自动清理"""
+    global _dev_shell
+    if _dev_shell is None:
+        _dev_shell = DevShell()
+        atexit.register(_dev_shell.close)
+    return _dev_shell
 
 def test_script_help():
     """测试帮助信息"""
     print("🧪 测试: 帮助信息")
-    success, stdout, stderr = run_command("./dev.sh help")
+    success, stdout, stderr = get_dev_shell().run("help")
     
-    if success and "用法:" in stdout:
+    if success and "用法: ./dev.sh" in stdout:
         print("✅ 帮助信息测试通过")
         return True
     else:
@@ -51,8 +151,7 @@ def test_config_loading():
         return False
     
     # 检查配置文件内容
-    with open("dev.local", "r") as f:
-        content = f.read()
+    content = read_text("dev.local")
         
     required_configs = [
         "PROJECT_NAME",
@@ -78,7 +177,7 @@ def test_directory_creation():
     print("🧪 测试: 目录创建")
     
     # 运行脚本的目录初始化部分
-    success, stdout, stderr = run_command("./dev.sh --help")  # 这会触发配置加载和目录创建
+    success, stdout, stderr = get_dev_shell().run("--help")  # 这会触发配置加载和目录创建
     
     required_dirs = ["pids", "logs"]
     missing_dirs = []
@@ -108,7 +207,7 @@ def test_port_check():
         sock.listen(1)
         
         # 模拟端口检查（这里我们只能检查脚本是否能正常运行）
-        success, stdout, stderr = run_command("./dev.sh status", timeout=10)
+        success, stdout, stderr = get_dev_shell().run("status", timeout=10)
         
         sock.close()
         
@@ -127,7 +226,7 @@ def test_service_status():
     """测试服务状态检查"""
     print("🧪 测试: 服务状态检查")
     
-    success, stdout, stderr = run_command("./dev.sh status", timeout=15)
+    success, stdout, stderr = get_dev_shell().run("status", timeout=15)
     
     if success and "服务状态检查" in stdout:
         print("✅ 服务状态检查测试通过")
@@ -143,13 +242,12 @@ def test_environment_check():
     print("🧪 测试: 环境检查")
     
     # 检查Python环境
-    python_version = subprocess.run(
-        ["python", "--version"], 
-        capture_output=True, 
-        text=True
-    )
+    try:
+        returncode, _, _ = probe_version(["python", "--version"])
+    except FileNotFoundError:
+        returncode = 1
     
-    if python_version.returncode != 0:
+    if returncode != 0:
         print("❌ Python环境检查失败")
         return False
     
@@ -187,7 +285,7 @@ def test_cleanup_functions():
         Path(file_path).touch()
     
     # 运行清理命令
-    success, stdout, stderr = run_command("./dev.sh clean", timeout=10)
+    success, stdout, stderr = get_dev_shell().run("clean", timeout=10)
     
     # 检查文件是否被清理
     cleaned = True
@@ -217,8 +315,7 @@ def test_makefile_integration():
         return True
     
     # 检查Makefile中是否有相关的目标
-    with open("Makefile", "r") as f:
-        makefile_content = f.read()
+    makefile_content = read_text("Makefile")
     
     if "dev.sh" in makefile_content or "dev-start" in makefile_content:
         print("✅ Makefile集成测试通过")
@@ -254,17 +351,21 @@ def main():
     passed = 0
     failed = 0
     
-    for test_func in tests:
-        try:
-            if test_func():
-                passed += 1
-            else:
+    try:
+        for test_func in tests:
+            try:
+                if test_func():
+                    passed += 1
+                else:
+                    failed += 1
+            except Exception as e:
+                print(f"❌ 测试 {test_func.__name__} 出现异常: {e}")
                 failed += 1
-        except Exception as e:
-            print(f"❌ 测试 {test_func.__name__} 出现异常: {e}")
-            failed += 1
-        
-        print()  # 空行分隔
+            
+            print()  # 空行分隔
+    finally:
+        if _dev_shell is not None:
+            _dev_shell.close()
     
     print("=" * 50)
     print(f"📊 测试结果: {passed} 通过, {failed} 失败")
@@ -9,14 +9,36 @@ import os
 import sys
 import time
 import json
+import mmap
+import re
 import threading
-import queue
+from collections import deque
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional
 import signal
+import shutil
 import argparse
 
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+    WATCHDOG_AVAILABLE = True
+except ImportError:
+    WATCHDOG_AVAILABLE = False
+
+# 状态输出间隔(秒)
+STATUS_INTERVAL = 30
+
+# 日志轮转时向前扫描/复制的块大小
+ROTATE_CHUNK_SIZE = 1 << 16
+
+# os.pread 仅 POSIX 可用
+PREAD_AVAILABLE = hasattr(os, 'pread')
+
+# 页缓存提示（Linux 等），源日志只顺序读取一次，读完即可从页缓存丢弃
+FADVISE_AVAILABLE = hasattr(os, 'posix_fadvise')
+
 # Windows环境设置UTF-8编码
 if sys.platform == 'win32':
     import locale
@@ -24,6 +46,27 @@ if sys.platform == 'win32':
     sys.stdout.reconfigure(encoding='utf-8')
     sys.stderr.reconfigure(encoding='utf-8')
 
+if WATCHDOG_AVAILABLE:
+    class LogFileEventHandler(FileSystemEventHandler):
+        """日志文件变更事件处理器（inotify / ReadDirectoryChangesW / FSEvents）"""
+        
+        def __init__(self, collector: 'UnifiedLogCollector'):
+            super().__init__()
+            self.collector = collector
+            
+        def on_modified(self, event):
+            if not event.is_directory:
+                self.collector._on_file_event(Path(event.src_path))
+                
+        def on_created(self, event):
+            if not event.is_directory:
+                self.collector._on_file_event(Path(event.src_path), created=True)
+                
+        def on_deleted(self, event):
+            if not event.is_directory:
+                self.collector._forget_file(Path(event.src_path))
+
+
 class UnifiedLogCollector:
     """统一日志收集器"""
     
@@ -52,15 +95,31 @@ class UnifiedLogCollector:
         # 文件位置记录（避免重复读取）
         self.file_positions: Dict[Path, int] = {}
         
-        # 日志队列
-        self.log_queue = queue.Queue()
+        # 轮询模式下 文件名 -> Path 的缓存（统一日志本身为 None）
+        self._known_paths: Dict[str, Optional[Path]] = {}
+        
+        # 已打开的源日志文件描述符（POSIX 下复用，避免每次 stat/open/close）
+        self.fds: Dict[Path, int] = {}
+        
+        # 日志缓冲：单生产者/单消费者，deque 的 append/popleft 本身线程安全，
+        # 仅用 Event 唤醒写入线程
+        self._buf = deque()
+        self._wake = threading.Event()
+        
+        # 统一日志当前行数（增量维护，避免每次写入后重新扫描文件）
+        self.line_count = 0
+        
+        # 统一日志文件句柄，收集器运行期间保持打开
+        self._out_fp = None
         
         # 运行标志
         self.running = False
+        self._stop_event = threading.Event()
         
         # 确保目录存在
         self.log_dir.mkdir(parents=True, exist_ok=True)
         self.output_file.parent.mkdir(parents=True, exist_ok=True)
+        self._output_resolved = self.output_file.resolve()
         
         # 要监控的日志文件模式
         self.log_patterns = [
@@ -79,6 +138,7 @@ class UnifiedLogCollector:
         
         # 清理旧日志
         self._clean_unified_log()
+        self._open_output()
         
         # 启动写入线程
         writer_thread = threading.Thread(target=self._writer_worker, daemon=True)
@@ -91,18 +151,24 @@ class UnifiedLogCollector:
         print(f"✓ 统一日志收集器已启动")
         print(f"  - 输出文件: {self.output_file}")
         print(f"  - 最大行数: {self.max_lines}")
-        print(f"  - 检查间隔: {self.check_interval}秒")
+        if WATCHDOG_AVAILABLE:
+            print(f"  - 监控方式: 文件系统事件")
+        else:
+            print(f"  - 检查间隔: {self.check_interval}秒")
         print(f"  - 监控目录: {self.log_dir}")
         print(f"  - 按 Ctrl+C 停止")
         print()
         
         # 等待信号
         try:
+            next_status = time.monotonic() + STATUS_INTERVAL
             while self.running:
                 time.sleep(1)
-                # 定期输出状态
-                if int(time.time()) % 30 == 0:
+                # 定期输出状态（单调时钟截止时间，每个周期只输出一次）
+                now = time.monotonic()
+                if now >= next_status:
                     self._print_status()
+                    next_status = now + STATUS_INTERVAL
         except KeyboardInterrupt:
             self.stop()
             
@@ -110,38 +176,161 @@ class UnifiedLogCollector:
         """停止日志收集器"""
         print("\n正在停止日志收集器...")
         self.running = False
+        self._stop_event.set()
+        self._wake.set()
         # 等待线程结束，但不要等太久
         max_wait = 5
         waited = 0
         while waited < max_wait and (threading.active_count() > 1):
             time.sleep(0.5)
             waited += 0.5
+        self._close_output()
+        self._close_fds()
         print("✓ 日志收集器已停止")
         # 确保进程退出
         sys.exit(0)
         
     def _collector_worker(self):
         """收集日志的工作线程"""
+        if WATCHDOG_AVAILABLE:
+            self._watch_worker()
+        else:
+            self._poll_worker()
+            
+    def _is_source_log(self, file_path: Path) -> bool:
+        """是否为需要收集的源日志（排除统一日志本身）"""
+        return (file_path.suffix == '.log'
+                and file_path.name != 'unified.log'
+                and file_path.resolve() != self._output_resolved)
+            
+    def _on_file_event(self, file_path: Path, created: bool = False):
+        """文件变更事件回调，只读取发生变化的文件"""
+        try:
+            if self._is_source_log(file_path):
+                # 新建的文件可能替换了同名旧文件，丢弃旧描述符
+                if created:
+                    self._forget_file(file_path)
+                self._collect_from_file(file_path)
+        except Exception as e:
+            print(f"收集错误: {e}")
+            
+    def _watch_worker(self):
+        """事件驱动收集：仅在文件被修改或创建时读取，日志空闲时没有任何轮询开销"""
+        # 启动时先从头收集一次已有文件（与轮询模式一致），之后只在事件到来时读取新增内容
+        for log_file in self.log_dir.glob("*.log"):
+            self._on_file_event(log_file)
+                    
+        observer = Observer()
+        observer.schedule(LogFileEventHandler(self), str(self.log_dir), recursive=False)
+        observer.start()
+        try:
+            self._stop_event.wait()
+        finally:
+            observer.stop()
+            observer.join(timeout=2)
+            
+    def _poll_worker(self):
+        """轮询收集（watchdog 不可用时的后备方案）"""
+        # 已知服务日志优先收集，其余 .log 文件随后
+        rank = {name: i for i, name in enumerate(self.log_patterns)}
         while self.running:
             try:
-                # 查找所有匹配的日志文件
-                for pattern in self.log_patterns:
-                    log_file = self.log_dir / pattern
-                    if log_file.exists():
-                        self._collect_from_file(log_file)
-                        
-                # 也收集其他.log文件（排除unified.log）
-                for log_file in self.log_dir.glob("*.log"):
-                    # 比较绝对路径，避免路径差异导致的问题
-                    if log_file.resolve() != self.output_file.resolve() and log_file.name != 'unified.log':
-                        self._collect_from_file(log_file)
+                log_files = self._scan_source_logs()
+                log_files.sort(key=lambda path: rank.get(path.name, len(rank)))
+                for log_file in log_files:
+                    self._collect_from_file(log_file, check_replaced=True)
                         
             except Exception as e:
                 print(f"收集错误: {e}")
                 
             time.sleep(self.check_interval)
             
-    def _collect_from_file(self, file_path: Path):
+    def _scan_source_logs(self) -> List[Path]:
+        """用 os.scandir 列出源日志；文件名首次出现时才创建 Path 并判断是否为统一日志本身"""
+        log_files = []
+        with os.scandir(self.log_dir) as it:
+            for entry in it:
+                name = entry.name
+                if not name.endswith('.log'):
+                    continue
+                if name not in self._known_paths:
+                    path = Path(entry.path)
+                    # 统一日志本身记为 None，之后直接跳过
+                    self._known_paths[name] = path if self._is_source_log(path) else None
+                path = self._known_paths[name]
+                if path is not None:
+                    log_files.append(path)
+        return log_files
+        
+    def _get_fd(self, file_path: Path) -> int:
+        """获取（缓存的）只读文件描述符"""
+        fd = self.fds.get(file_path)
+        if fd is None:
+            fd = os.open(str(file_path), os.O_RDONLY)
+            if FADVISE_AVAILABLE:
+                try:
+                    os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+                except OSError:
+                    pass
+            self.fds[file_path] = fd
+        return fd
+        
+    def _forget_file(self, file_path: Path):
+        """关闭缓存的文件描述符并重置读取位置（文件被重建或删除时调用）"""
+        fd = self.fds.pop(file_path, None)
+        if fd is not None:
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+        self.file_positions.pop(file_path, None)
+        
+    def _close_fds(self):
+        """关闭所有缓存的文件描述符"""
+        for file_path in list(self.fds):
+            fd = self.fds.pop(file_path)
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+                
+    def _read_new_bytes(self, file_path: Path, last_position: int, check_replaced: bool):
+        """读取 last_position 之后的新内容，返回 (数据, 数据起始位置)"""
+        if not PREAD_AVAILABLE:
+            # Windows 无 pread，且长期持有句柄会阻止服务轮转/删除日志，按次打开
+            current_size = file_path.stat().st_size
+            if current_size < last_position:
+                last_position = 0
+            if current_size <= last_position:
+                return b'', last_position
+            with open(file_path, 'rb') as f:
+                f.seek(last_position)
+                return f.read(current_size - last_position), last_position
+                
+        # POSIX：复用已打开的描述符，fstat + pread，无需 stat/open/seek/close
+        fd = self._get_fd(file_path)
+        st = os.fstat(fd)
+        if check_replaced and os.stat(file_path).st_ino != st.st_ino:
+            # 文件被删除后重建，重新打开并从头读取
+            self._forget_file(file_path)
+            fd = self._get_fd(file_path)
+            st = os.fstat(fd)
+            last_position = 0
+        # 文件变小说明被截断轮转
+        if st.st_size < last_position:
+            last_position = 0
+        if st.st_size <= last_position:
+            return b'', last_position
+        data = os.pread(fd, st.st_size - last_position, last_position)
+        if FADVISE_AVAILABLE:
+            # 已消费的部分不会再读，释放其页缓存，留给 ES/Qdrant/Redis 等数据服务
+            try:
+                os.posix_fadvise(fd, 0, last_position + len(data), os.POSIX_FADV_DONTNEED)
+            except OSError:
+                pass
+        return data, last_position
+            
+    def _collect_from_file(self, file_path: Path, check_replaced: bool = False):
         """从单个文件收集日志"""
         try:
             # 跳过统一日志文件本身，避免递归
@@ -154,75 +343,70 @@ class UnifiedLogCollector:
             # 获取上次读取位置
             last_position = self.file_positions.get(file_path, 0)
             
-            # 获取当前文件大小
-            current_size = file_path.stat().st_size
+            data, start_position = self._read_new_bytes(file_path, last_position, check_replaced)
             
-            # 如果文件变小了，说明被轮转了
-            if current_size < last_position:
-                last_position = 0
-                
             # 如果有新内容
-            if current_size > last_position:
-                with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    f.seek(last_position)
-                    
-                    # 读取新行
-                    for line in f:
-                        line = line.strip()
-                        if line:
-                            # 添加时间戳和服务标识
-                            log_entry = {
-                                'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                                'service': service_name,
-                                'message': line
-                            }
-                            self.log_queue.put(log_entry)
-                            
-                    # 更新位置
-                    self.file_positions[file_path] = f.tell()
-                    
+            if data:
+                # 时间戳和服务标识每批只格式化一次，直接入队已格式化好的字节行
+                timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                prefix = f"[{timestamp}] [{service_name}] ".encode('utf-8')
+                for line in data.splitlines():
+                    line = line.strip()
+                    if line:
+                        self._buf.append(prefix + line + b"\n")
+                if len(self._buf) >= 100:
+                    self._wake.set()
+                        
+                # 更新位置
+                self.file_positions[file_path] = start_position + len(data)
+                
+        except FileNotFoundError:
+            self._forget_file(file_path)
         except Exception as e:
             # 忽略单个文件的错误
             pass
             
     def _writer_worker(self):
         """写入日志的工作线程"""
-        buffer = []
-        last_flush = time.time()
-        
-        while self.running or not self.log_queue.empty():
+        while self.running or self._buf:
             try:
-                # 批量获取日志
-                deadline = time.time() + 0.1
-                while time.time() < deadline and len(buffer) < 100:
-                    try:
-                        entry = self.log_queue.get(timeout=0.1)
-                        buffer.append(entry)
-                    except queue.Empty:
-                        break
-                        
-                # 定期写入或缓冲区满
-                if buffer and (len(buffer) >= 100 or time.time() - last_flush > 1):
-                    self._write_logs(buffer)
-                    buffer.clear()
-                    last_flush = time.time()
+                # 缓冲满 100 行时被唤醒，否则最多每秒写入一次
+                self._wake.wait(1.0)
+                self._wake.clear()
+                
+                batch = []
+                while self._buf:
+                    batch.append(self._buf.popleft())
+                if batch:
+                    self._write_logs(batch)
                     
                 # 检查是否需要轮转
-                if self.output_file.exists():
-                    line_count = self._count_lines(self.output_file)
-                    if line_count > self.max_lines:
-                        self._rotate_log()
+                if self.line_count > self.max_lines:
+                    self._rotate_log()
                         
             except Exception as e:
                 print(f"写入错误: {e}")
                 
-    def _write_logs(self, entries: List[dict]):
+    def _open_output(self):
+        """打开统一日志文件（追加模式）"""
+        self._out_fp = open(self.output_file, 'ab', buffering=1 << 16)
+        
+    def _close_output(self):
+        """关闭统一日志文件"""
+        if self._out_fp is not None:
+            try:
+                self._out_fp.close()
+            except Exception:
+                pass
+            self._out_fp = None
+            
+    def _write_logs(self, entries: List[bytes]):
         """批量写入日志"""
         try:
-            with open(self.output_file, 'a', encoding='utf-8') as f:
-                for entry in entries:
-                    line = f"[{entry['timestamp']}] [{entry['service']}] {entry['message']}\n"
-                    f.write(line)
+            # 整批拼接后一次写入；每批刷新一次，tail -f 等读取方可及时看到
+            self._out_fp.write(b"".join(entries))
+            self._out_fp.flush()
+            self.line_count += len(entries)
         except Exception as e:
             print(f"写入失败: {e}")
             
@@ -232,46 +416,94 @@ class UnifiedLogCollector:
             if not self.output_file.exists():
                 return
                 
-            # 读取所有行
-            with open(self.output_file, 'r', encoding='utf-8', errors='ignore') as f:
-                lines = f.readlines()
-                
-            # 保留一定比例的行
+            # 重写前关闭当前句柄，完成后重新打开
+            self._close_output()
+            
+            # 保留一定比例的行：从文件末尾向前定位保留部分的起点，只复制这段尾部
             keep_lines = int(self.max_lines * self.rotation_ratio)
-            if len(lines) > keep_lines:
-                lines = lines[-keep_lines:]
-                
-            # 写回文件
-            with open(self.output_file, 'w', encoding='utf-8') as f:
-                f.writelines(lines)
-                f.write(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [SYSTEM] 日志已轮转\n")
+            tmp_file = self.output_file.with_name(self.output_file.name + '.tmp')
+            with open(self.output_file, 'rb') as src:
+                cut_off, kept = self._find_tail_offset(src, keep_lines)
+                with open(tmp_file, 'wb') as dst:
+                    self._copy_range(src, dst, cut_off)
+                    dst.write(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [SYSTEM] 日志已轮转\n".encode('utf-8'))
+                    
+            # 原子替换
+            os.replace(tmp_file, self.output_file)
+            self.line_count = kept + 1
                 
         except Exception as e:
             print(f"轮转失败: {e}")
+        finally:
+            if self._out_fp is None and self.running:
+                self._open_output()
             
+    @staticmethod
+    def _find_tail_offset(f, keep_lines: int):
+        """从末尾按块向前扫描换行符，返回 (保留部分的起始偏移, 保留行数)"""
+        size = f.seek(0, os.SEEK_END)
+        if size == 0:
+            return 0, 0
+        f.seek(size - 1)
+        # 最后一行没有换行符时也算作一行
+        trailing_newline = f.read(1) == b"\n"
+        newlines_needed = keep_lines + (1 if trailing_newline else 0)
+        if newlines_needed == 0:
+            return size, 0
+        
+        count = 0
+        pos = size
+        while pos > 0:
+            chunk_size = min(ROTATE_CHUNK_SIZE, pos)
+            pos -= chunk_size
+            f.seek(pos)
+            chunk = f.read(chunk_size)
+            chunk_count = chunk.count(b"\n")
+            if count + chunk_count >= newlines_needed:
+                # 保留起点在本块内：从块尾向前找到第 newlines_needed 个换行符
+                idx = len(chunk)
+                for _ in range(newlines_needed - count):
+                    idx = chunk.rfind(b"\n", 0, idx)
+                return pos + idx + 1, keep_lines
+            count += chunk_count
+            
+        # 文件总行数不足 keep_lines，全部保留
+        return 0, count if trailing_newline else count + 1
+        
+    @staticmethod
+    def _copy_range(src, dst, offset: int):
+        """把 src 从 offset 到末尾的内容复制到 dst（POSIX 下用 sendfile 在内核中复制）"""
+        size = os.fstat(src.fileno()).st_size
+        if hasattr(os, 'sendfile'):
+            try:
+                while offset < size:
+                    sent = os.sendfile(dst.fileno(), src.fileno(), offset, size - offset)
+                    if sent == 0:
+                        break
+                    offset += sent
+                return
+            except OSError:
+                # 部分平台/文件系统不支持普通文件间 sendfile，从当前偏移继续用普通复制
+                pass
+        src.seek(offset)
+        shutil.copyfileobj(src, dst, ROTATE_CHUNK_SIZE)
+        
     def _clean_unified_log(self):
         """清理统一日志文件"""
         try:
             with open(self.output_file, 'w', encoding='utf-8') as f:
                 f.write(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [SYSTEM] ========== 日志收集器启动 ==========\n")
+            self.line_count = 1
         except Exception as e:
             print(f"清理日志失败: {e}")
             
-    def _count_lines(self, file_path: Path) -> int:
-        """快速计算文件行数"""
-        try:
-            with open(file_path, 'rb') as f:
-                return sum(1 for _ in f)
-        except:
-            return 0
-            
     def _print_status(self):
         """打印状态信息"""
         try:
             if self.output_file.exists():
-                line_count = self._count_lines(self.output_file)
+                line_count = self.line_count
                 file_size = self.output_file.stat().st_size / 1024 / 1024  # MB
-                queue_size = self.log_queue.qsize()
+                queue_size = len(self._buf)
                 
                 status = f"[状态] 行数: {line_count}/{self.max_lines} | 大小: {file_size:.2f}MB | 队列: {queue_size}"
                 print(f"\r{status}", end='', flush=True)
@@ -281,30 +513,51 @@ class UnifiedLogCollector:
 class LogSearcher:
     """日志搜索工具"""
     
+    LEVEL_PATTERNS = {
+        'ERROR': ['ERROR', 'EXCEPTION', 'FAILED', 'FATAL'],
+        'WARN': ['WARN', 'WARNING'],
+        'INFO': ['INFO'],
+        'DEBUG': ['DEBUG', 'TRACE']
+    }
+    
     @staticmethod
     def search(log_file: str, pattern: str, service: Optional[str] = None, level: Optional[str] = None):
         """搜索日志"""
+        # 模式匹配交给 C 实现的正则引擎在 mmap 上直接扫描字节，命中后才取出所在行做过滤
+        pattern_re = re.compile(re.escape(pattern.encode('utf-8')), re.IGNORECASE)
+        service_tag = f"[{service}]".encode('utf-8') if service else None
+        level_re = None
+        if level:
+            keywords = LogSearcher.LEVEL_PATTERNS.get(level.upper(), [])
+            if not keywords:
+                return
+            level_re = re.compile(b"|".join(re.escape(k.encode()) for k in keywords), re.IGNORECASE)
+            
         try:
-            with open(log_file, 'r', encoding='utf-8', errors='ignore') as f:
-                for line in f:
-                    # 服务过滤
-                    if service and f"[{service}]" not in line:
-                        continue
+            with open(log_file, 'rb') as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    return
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    pos = 0
+                    while True:
+                        match = pattern_re.search(mm, pos)
+                        if match is None:
+                            break
+                        line_start = mm.rfind(b"\n", 0, match.start()) + 1
+                        line_end = mm.find(b"\n", match.end())
+                        if line_end == -1:
+                            line_end = len(mm)
+                        # 同一行只输出一次，从下一行继续搜索
+                        pos = line_end + 1
                         
-                    # 级别过滤
-                    if level:
-                        level_patterns = {
-                            'ERROR': ['ERROR', 'EXCEPTION', 'FAILED', 'FATAL'],
-                            'WARN': ['WARN', 'WARNING'],
-                            'INFO': ['INFO'],
-                            'DEBUG': ['DEBUG', 'TRACE']
-                        }
-                        if not any(p in line.upper() for p in level_patterns.get(level.upper(), [])):
+                        line = mm[line_start:line_end]
+                        # 服务过滤
+                        if service_tag and service_tag not in line:
+                            continue
+                        # 级别过滤
+                        if level_re and not level_re.search(line):
                             continue
-                            
-                    # 模式匹配
-                    if pattern.lower() in line.lower():
-                        print(line.strip())
+                        print(line.decode('utf-8', errors='ignore').strip())
                         
         except Exception as e:
             print(f"搜索失败: {e}")
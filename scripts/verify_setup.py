@@ -2,11 +2,14 @@
 """
 验证本地开发环境安装脚本
 检查所有必需的服务是否正常运行
+使用 --deep 对 Python 包执行真实导入检查（默认只检查是否安装）
 """
 
 import sys
 import time
 import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import requests
 import psycopg2
 import redis
@@ -14,14 +17,40 @@ from elasticsearch import Elasticsearch
 from qdrant_client import QdrantClient
 from qdrant_client.http.exceptions import ResponseHandlingException
 
+from _parse_cache import check_imports, check_installed, probe_version
+
+
+# 并行执行时各检查的输出先缓存在线程本地，结束后按原顺序打印
+_local = threading.local()
+
+# 单个服务连接的超时(秒)
+CONNECT_TIMEOUT = 2
+
 
 def print_status(service_name, status, message=""):
     """打印服务状态"""
     status_symbol = "✅" if status else "❌"
-    print(f"{status_symbol} {service_name}: {message}")
+    line = f"{status_symbol} {service_name}: {message}"
+    buffer = getattr(_local, 'buffer', None)
+    if buffer is not None:
+        buffer.append(line)
+    else:
+        print(line)
     return status
 
 
+def _run_buffered(test_func):
+    """在工作线程中执行检查，返回 (结果, 输出行)"""
+    _local.buffer = []
+    try:
+        return test_func(), _local.buffer
+    except Exception as e:
+        _local.buffer.append(f"❌ {test_func.__name__}: 检查异常: {e}")
+        return False, _local.buffer
+    finally:
+        _local.buffer = None
+
+
 def test_postgresql():
     """测试 PostgreSQL 连接"""
     try:
@@ -29,7 +58,8 @@ def test_postgresql():
             host="localhost",
             port=5432,
             database="postgres",  # 连接默认数据库
-            user="postgres"
+            user="postgres",
+            connect_timeout=CONNECT_TIMEOUT
         )
         conn.close()
         return print_status("PostgreSQL", True, "连接成功")
@@ -40,7 +70,8 @@ def test_postgresql():
 def test_redis():
     """测试 Redis 连接"""
     try:
-        r = redis.Redis(host='localhost', port=6379, decode_responses=True)
+        r = redis.Redis(host='localhost', port=6379, decode_responses=True,
+                        socket_timeout=CONNECT_TIMEOUT, socket_connect_timeout=CONNECT_TIMEOUT)
         r.ping()
         return print_status("Redis", True, "连接成功")
     except redis.RedisError as e:
@@ -50,7 +81,8 @@ def test_redis():
 def test_elasticsearch():
     """测试 Elasticsearch 连接"""
     try:
-        es = Elasticsearch([{'host': 'localhost', 'port': 9200}])
+        es = Elasticsearch([{'host': 'localhost', 'port': 9200, 'scheme': 'http'}],
+                           request_timeout=CONNECT_TIMEOUT)
         info = es.info()
         version = info['version']['number']
         return print_status("Elasticsearch", True, f"连接成功 (版本: {version})")
@@ -61,7 +93,7 @@ def test_elasticsearch():
 def test_qdrant():
     """测试 Qdrant 连接"""
     try:
-        client = QdrantClient(host="localhost", port=6333)
+        client = QdrantClient(host="localhost", port=6333, timeout=CONNECT_TIMEOUT)
         collections = client.get_collections()
         return print_status("Qdrant", True, "连接成功")
     except ResponseHandlingException as e:
@@ -82,13 +114,19 @@ def test_python_packages():
         ('numpy', 'NumPy')
     ]
     
+    # 默认只检查是否安装，不导入 torch/transformers 等重量级包；
+    # --deep 时执行真实导入以发现损坏的安装（结果按虚拟环境缓存）
+    deep = '--deep' in sys.argv
+    names = [package for package, _ in packages]
+    results = check_imports(names) if deep else check_installed(names)
+    ok_message, fail_message = ("导入成功", "导入失败") if deep else ("已安装", "未安装")
+    
     all_success = True
     for package, display_name in packages:
-        try:
-            __import__(package)
-            print_status(f"Python包: {display_name}", True, "导入成功")
-        except ImportError:
-            print_status(f"Python包: {display_name}", False, "导入失败")
+        if results[package]:
+            print_status(f"Python包: {display_name}", True, ok_message)
+        else:
+            print_status(f"Python包: {display_name}", False, fail_message)
             all_success = False
     
     return all_success
@@ -96,15 +134,10 @@ def test_python_packages():
 
 def test_java():
     """测试 Java 环境"""
-    import subprocess
     try:
-        result = subprocess.run(
-            ['java', '-version'], 
-            capture_output=True, 
-            text=True
-        )
-        if result.returncode == 0:
-            version_line = result.stderr.split('\n')[0] if result.stderr else result.stdout.split('\n')[0]
+        returncode, stdout, stderr = probe_version(['java', '-version'])
+        if returncode == 0:
+            version_line = stderr.split('\n')[0] if stderr else stdout.split('\n')[0]
             return print_status("Java", True, version_line)
         else:
             return print_status("Java", False, "未找到 Java")
@@ -114,15 +147,10 @@ def test_java():
 
 def test_nodejs():
     """测试 Node.js 环境"""
-    import subprocess
     try:
-        result = subprocess.run(
-            ['node', '--version'], 
-            capture_output=True, 
-            text=True
-        )
-        if result.returncode == 0:
-            version = result.stdout.strip()
+        returncode, stdout, stderr = probe_version(['node', '--version'])
+        if returncode == 0:
+            version = stdout.strip()
             return print_status("Node.js", True, f"版本: {version}")
         else:
             return print_status("Node.js", False, "版本检查失败")
@@ -135,23 +163,28 @@ def main():
     print("🔍 开始验证 Qsou 投资情报搜索引擎开发环境...")
     print("=" * 60)
     
+    env_tests = [test_java, test_python_packages, test_nodejs]
+    service_tests = [test_postgresql, test_redis, test_elasticsearch, test_qdrant]
+    
+    # 各检查互不依赖（子进程启动/TCP 连接），并行执行，总耗时取决于最慢的一项
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        futures = {test: executor.submit(_run_buffered, test) for test in env_tests + service_tests}
+        results = {test: future.result() for test, future in futures.items()}
+    
     # 基础环境检查
     print("\n📋 基础环境检查:")
-    java_ok = test_java()
-    python_ok = test_python_packages()
-    nodejs_ok = test_nodejs()
+    for test in env_tests:
+        print("\n".join(results[test][1]))
     
     # 服务连接检查
     print("\n🔌 服务连接检查:")
-    postgresql_ok = test_postgresql()
-    redis_ok = test_redis()
-    elasticsearch_ok = test_elasticsearch()
-    qdrant_ok = test_qdrant()
+    for test in service_tests:
+        print("\n".join(results[test][1]))
     
     print("\n" + "=" * 60)
     
     # 总结结果
-    all_services = [java_ok, python_ok, nodejs_ok, postgresql_ok, redis_ok, elasticsearch_ok, qdrant_ok]
+    all_services = [results[test][0] for test in env_tests + service_tests]
     success_count = sum(all_services)
     total_count = len(all_services)
     
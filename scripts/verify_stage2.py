@@ -6,186 +6,229 @@
 
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+# 统计行数时每次读取的字节数
+COUNT_CHUNK_SIZE = 1 << 20
+
+# 阶段二应当存在的文件（按报告顺序）
+EXPECTED_PATHS = (
+    "api-gateway/app/main.py",
+    "api-gateway/app/core/config.py",
+    "api-gateway/app/core/database.py",
+    "api-gateway/app/api/v1/endpoints/search.py",
+    "api-gateway/app/api/v1/endpoints/documents.py",
+    "api-gateway/app/api/v1/endpoints/intelligence.py",
+    "api-gateway/app/api/v1/endpoints/health.py",
+    "api-gateway/requirements.txt",
+    "crawler/qsou_crawler/settings.py",
+    "crawler/qsou_crawler/items.py",
+    "crawler/requirements.txt",
+    "dev.sh",
+    "dev.local"
+)
+
+# 结构报告中路径列的宽度
+PATH_WIDTH = max(map(len, EXPECTED_PATHS))
+
+# API Gateway 核心文件（相对 api-gateway/app）
+API_FILES = (
+    ("main.py", "FastAPI应用主入口"),
+    ("core/config.py", "配置管理"),
+    ("core/database.py", "数据库连接"),
+    ("core/logging.py", "日志系统"),
+    ("api/v1/router.py", "API路由"),
+    ("middleware/request_logging.py", "请求日志中间件"),
+    ("middleware/metrics.py", "性能指标中间件")
+)
+
+# API 端点（相对 api-gateway/app/api/v1/endpoints）
+API_ENDPOINTS = (
+    ("search.py", "搜索引擎API - 全文搜索、语义搜索、混合搜索"),
+    ("documents.py", "文档管理API - CRUD操作、批量处理"),
+    ("intelligence.py", "智能分析API - 情报生成、趋势分析、监控任务"),
+    ("health.py", "系统监控API - 健康检查、指标收集、服务状态")
+)
+
+# 爬虫框架文件（相对 crawler/qsou_crawler）
+CRAWLER_FILES = (
+    ("settings.py", "爬虫配置 - 合规性、反检测、分布式"),
+    ("items.py", "数据模型 - 新闻、公告、研报、市场数据")
+)
+
+# 并行统计行数的线程数（读取时释放 GIL，I/O 可重叠）
+COUNT_WORKERS = 8
+
+# 已扫描目录中的条目：相对路径 -> os.DirEntry
+_entries = {}
+# 已扫描过的目录
+_scanned_dirs = set()
+
 def main():
     print("🔍 阶段二：数据采集系统开发 - 成果验证")
     print("=" * 60)
     
-    # 验证项目结构
-    verify_project_structure()
-    print()
-    
-    # 验证API Gateway
-    verify_api_gateway()
-    print()
-    
-    # 验证爬虫框架
-    verify_crawler_framework()
-    print()
+    # 项目结构 / API Gateway / 爬虫框架三项验证互不依赖，并行执行后按原顺序输出
+    checks = (verify_project_structure, verify_api_gateway, verify_crawler_framework)
+    with ThreadPoolExecutor(max_workers=len(checks)) as executor:
+        futures = [executor.submit(check) for check in checks]
+        for future in futures:
+            sys.stdout.write(future.result())
+            print()
     
     # 总结成果
     print_stage2_summary()
 
 def verify_project_structure():
-    """验证项目结构"""
-    print("📁 项目结构验证")
-    print("-" * 30)
-    
-    expected_paths = [
-        "api-gateway/app/main.py",
-        "api-gateway/app/core/config.py",
-        "api-gateway/app/core/database.py",
-        "api-gateway/app/api/v1/endpoints/search.py",
-        "api-gateway/app/api/v1/endpoints/documents.py",
-        "api-gateway/app/api/v1/endpoints/intelligence.py",
-        "api-gateway/app/api/v1/endpoints/health.py",
-        "api-gateway/requirements.txt",
-        "crawler/qsou_crawler/settings.py",
-        "crawler/qsou_crawler/items.py",
-        "crawler/requirements.txt",
-        "dev.sh",
-        "dev.local"
-    ]
+    """验证项目结构，返回报告文本"""
+    lines = ["📁 项目结构验证", "-" * 30]
     
     existing_count = 0
-    for path in expected_paths:
-        if os.path.exists(path):
-            size = os.path.getsize(path)
-            print(f"✅ {path} ({size:,} bytes)")
+    for path in EXPECTED_PATHS:
+        entry = find_entry(path)
+        if entry is not None:
+            size = entry.stat().st_size
+            lines.append(f"✅ {path:<{PATH_WIDTH}} ({size:,} bytes)")
             existing_count += 1
         else:
-            print(f"❌ {path} (missing)")
+            lines.append(f"❌ {path:<{PATH_WIDTH}} (missing)")
     
-    print(f"\n📊 结构完整性: {existing_count}/{len(expected_paths)} ({existing_count/len(expected_paths)*100:.1f}%)")
+    lines.append(f"\n📊 结构完整性: {existing_count}/{len(EXPECTED_PATHS)} ({existing_count/len(EXPECTED_PATHS)*100:.1f}%)")
+    return "\n".join(lines) + "\n"
 
 def verify_api_gateway():
-    """验证API Gateway"""
-    print("🚀 API Gateway 验证")
-    print("-" * 30)
-    
-    # 检查核心文件
-    api_files = {
-        "main.py": "FastAPI应用主入口",
-        "core/config.py": "配置管理",
-        "core/database.py": "数据库连接",
-        "core/logging.py": "日志系统",
-        "api/v1/router.py": "API路由",
-        "middleware/request_logging.py": "请求日志中间件",
-        "middleware/metrics.py": "性能指标中间件"
-    }
-    
-    for file, desc in api_files.items():
-        full_path = f"api-gateway/app/{file}"
-        if os.path.exists(full_path):
-            lines = count_lines(full_path)
-            print(f"✅ {desc}: {lines} 行代码")
-        else:
-            print(f"❌ {desc}: 文件缺失")
-    
-    # 检查API端点
-    print("\n🔌 API端点:")
-    endpoints = [
-        ("search.py", "搜索引擎API - 全文搜索、语义搜索、混合搜索"),
-        ("documents.py", "文档管理API - CRUD操作、批量处理"),
-        ("intelligence.py", "智能分析API - 情报生成、趋势分析、监控任务"),
-        ("health.py", "系统监控API - 健康检查、指标收集、服务状态")
+    """验证API Gateway，返回报告文本"""
+    file_paths = [f"api-gateway/app/{file}" for file, _ in API_FILES]
+    endpoint_paths = [f"api-gateway/app/api/v1/endpoints/{filename}" for filename, _ in API_ENDPOINTS]
+    line_counts = count_lines_many(file_paths + endpoint_paths)
+    
+    lines = ["🚀 API Gateway 验证", "-" * 30]
+    lines += [
+        f"✅ {desc}: {line_counts[path]} 行代码" if line_counts[path] is not None else f"❌ {desc}: 文件缺失"
+        for path, (_, desc) in zip(file_paths, API_FILES)
     ]
-    
-    for filename, desc in endpoints:
-        path = f"api-gateway/app/api/v1/endpoints/{filename}"
-        if os.path.exists(path):
-            lines = count_lines(path)
-            print(f"  ✅ {desc} ({lines} 行)")
-        else:
-            print(f"  ❌ {desc} (缺失)")
+    lines.append("\n🔌 API端点:")
+    lines += [
+        f"  ✅ {desc} ({line_counts[path]} 行)" if line_counts[path] is not None else f"  ❌ {desc} (缺失)"
+        for path, (_, desc) in zip(endpoint_paths, API_ENDPOINTS)
+    ]
+    return "\n".join(lines) + "\n"
 
 def verify_crawler_framework():
-    """验证爬虫框架"""
-    print("🕷️ Scrapy爬虫框架验证")
-    print("-" * 30)
-    
-    crawler_files = {
-        "settings.py": "爬虫配置 - 合规性、反检测、分布式",
-        "items.py": "数据模型 - 新闻、公告、研报、市场数据"
-    }
-    
-    for file, desc in crawler_files.items():
-        full_path = f"crawler/qsou_crawler/{file}"
-        if os.path.exists(full_path):
-            lines = count_lines(full_path)
-            print(f"✅ {desc}: {lines} 行代码")
-        else:
-            print(f"❌ {desc}: 文件缺失")
+    """验证爬虫框架，返回报告文本"""
+    file_paths = [f"crawler/qsou_crawler/{file}" for file, _ in CRAWLER_FILES]
+    line_counts = count_lines_many(file_paths)
+    
+    lines = ["🕷️ Scrapy爬虫框架验证", "-" * 30]
+    lines += [
+        f"✅ {desc}: {line_counts[path]} 行代码" if line_counts[path] is not None else f"❌ {desc}: 文件缺失"
+        for path, (_, desc) in zip(file_paths, CRAWLER_FILES)
+    ]
     
     # 检查配置特性
-    if os.path.exists("crawler/qsou_crawler/settings.py"):
-        print("\n⚖️ 合规性特性:")
-        print("  ✅ 严格遵循robots.txt")
-        print("  ✅ 智能请求频率控制")
-        print("  ✅ 用户代理轮换")
-        print("  ✅ 域名白名单机制")
-        print("  ✅ 分布式爬虫支持")
-
-def count_lines(file_path):
-    """统计文件行数"""
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return sum(1 for _ in f)
-    except:
-        return 0
+    if find_entry("crawler/qsou_crawler/settings.py") is not None:
+        lines += [
+            "\n⚖️ 合规性特性:",
+            "  ✅ 严格遵循robots.txt",
+            "  ✅ 智能请求频率控制",
+            "  ✅ 用户代理轮换",
+            "  ✅ 域名白名单机制",
+            "  ✅ 分布式爬虫支持"
+        ]
+    return "\n".join(lines) + "\n"
+
+def find_entry(path):
+    """查找文件对应的目录条目（不存在时返回 None）；每个父目录只用 os.scandir 枚举一次"""
+    parent = path.rpartition('/')[0]
+    if parent not in _scanned_dirs:
+        # 各验证并行执行：先填充条目再标记目录已扫描，并发时最多重复扫描一次，不会漏查
+        scanned = {}
+        try:
+            with os.scandir(parent or '.') as it:
+                for entry in it:
+                    scanned[f"{parent}/{entry.name}" if parent else entry.name] = entry
+        except OSError:
+            pass
+        _entries.update(scanned)
+        _scanned_dirs.add(parent)
+    return _entries.get(path)
+
+def count_lines_many(paths):
+    """并行统计多个文件的行数，返回 {路径: 行数}，文件缺失时为 None"""
+    def count(path):
+        # 直接打开：是否存在和行数由同一次 open + read 得到，不再单独 stat
+        try:
+            with open(path, 'rb') as f:
+                return _count_newlines(f)
+        except FileNotFoundError:
+            return None
+        except OSError:
+            return 0
+    
+    with ThreadPoolExecutor(max_workers=COUNT_WORKERS) as executor:
+        return dict(zip(paths, executor.map(count, paths)))
+
+def _count_newlines(f):
+    """按块读取字节并统计换行符，不逐行解码；小文件一次读取即可读完"""
+    count = 0
+    last = b'\n'
+    for chunk in iter(lambda: f.read(COUNT_CHUNK_SIZE), b''):
+        count += chunk.count(b'\n')
+        last = chunk[-1:]
+    # 最后一行没有换行符时也算作一行
+    return count + (last != b'\n')
+
+# 阶段二成果总结（静态文本，一次写出）
+STAGE2_SUMMARY = """\
+🎯 阶段二成果总结
+============================================================
+✅ API Gateway服务 (FastAPI)
+   • 完整的RESTful API架构
+   • 搜索引擎接口 (全文+语义搜索)
+   • 文档管理系统
+   • 智能分析服务
+   • 系统监控和健康检查
+   • 结构化日志和性能指标
+
+✅ Scrapy分布式爬虫框架
+   • 合规的网络爬取配置
+   • 多数据源适配 (新闻、公告、研报)
+   • 反检测和代理支持
+   • 数据质量验证管道
+   • Redis分布式调度
+
+✅ 数据模型和处理
+   • 结构化数据定义 (Pydantic)
+   • 自动数据清洗和验证
+   • 多格式数据解析
+   • NLP预处理集成
+
+✅ 开发环境管理
+   • 一键启动脚本 (dev.sh)
+   • 统一配置管理 (dev.local)
+   • 服务健康监控
+   • 端口管理和进程控制
+
+============================================================
+🚀 所见即可用原则验证:
+   ✅ 所有代码都是生产级别的真实实现
+   ✅ 没有使用任何模拟数据或占位符
+   ✅ 完整的错误处理和日志记录
+   ✅ 符合行业最佳实践和安全标准
+   ✅ 支持水平扩展和微服务架构
+
+📋 下一步工作:
+   1. 安装依赖包: cd api-gateway && pip install -r requirements.txt
+   2. 启动外部服务: Elasticsearch, Redis, PostgreSQL, Qdrant
+   3. 运行API服务: python -m app.main
+   4. 测试API端点: curl http://localhost:8000/docs
+   5. 部署爬虫: cd crawler && scrapy crawl news_spider
+"""
 
 def print_stage2_summary():
     """打印阶段二成果总结"""
-    print("🎯 阶段二成果总结")
-    print("=" * 60)
-    
-    achievements = [
-        "✅ API Gateway服务 (FastAPI)",
-        "   • 完整的RESTful API架构",
-        "   • 搜索引擎接口 (全文+语义搜索)",
-        "   • 文档管理系统",
-        "   • 智能分析服务",
-        "   • 系统监控和健康检查",
-        "   • 结构化日志和性能指标",
-        "",
-        "✅ Scrapy分布式爬虫框架",
-        "   • 合规的网络爬取配置",
-        "   • 多数据源适配 (新闻、公告、研报)",
-        "   • 反检测和代理支持",
-        "   • 数据质量验证管道",
-        "   • Redis分布式调度",
-        "",
-        "✅ 数据模型和处理",
-        "   • 结构化数据定义 (Pydantic)",
-        "   • 自动数据清洗和验证",
-        "   • 多格式数据解析",
-        "   • NLP预处理集成",
-        "",
-        "✅ 开发环境管理",
-        "   • 一键启动脚本 (dev.sh)",
-        "   • 统一配置管理 (dev.local)",
-        "   • 服务健康监控",
-        "   • 端口管理和进程控制"
-    ]
-    
-    for item in achievements:
-        print(item)
-    
-    print("\n" + "=" * 60)
-    print("🚀 所见即可用原则验证:")
-    print("   ✅ 所有代码都是生产级别的真实实现")
-    print("   ✅ 没有使用任何模拟数据或占位符")
-    print("   ✅ 完整的错误处理和日志记录")
-    print("   ✅ 符合行业最佳实践和安全标准")
-    print("   ✅ 支持水平扩展和微服务架构")
-    
-    print("\n📋 下一步工作:")
-    print("   1. 安装依赖包: cd api-gateway && pip install -r requirements.txt")
-    print("   2. 启动外部服务: Elasticsearch, Redis, PostgreSQL, Qdrant")
-    print("   3. 运行API服务: python -m app.main")
-    print("   4. 测试API端点: curl http://localhost:8000/docs")
-    print("   5. 部署爬虫: cd crawler && scrapy crawl news_spider")
+    sys.stdout.write(STAGE2_SUMMARY)
 
 if __name__ == "__main__":
     main()